@@ -1,10 +1,4 @@
-from random import random
-
-import pygame
 from pygame.sprite import Sprite
-import alien_color_converter as converter
-
-from alien_bullet import AlienBullet
 
 class Alien(Sprite):
     """A class to represent a single alien in the fleet."""
@@ -13,24 +7,28 @@ class Alien(Sprite):
         """Initialize the alien and set its starting position."""
         super().__init__()
         self.ai_game = ai_game
-        self.screen = ai_game.screen
         self.settings = ai_game.settings
 
         # Determine if the alien can shoot.
-        #  The initial cooldown period after the alien is spawned is random.
-        self.can_shoot = random() < self.settings.alien_shooter_probability
-        self.shoot_cooldown = random() * self.settings.cooldown_period
+        #  The initial cooldown period after the alien is spawned is random;
+        #  the fleet schedules its shots from it.
+        random = ai_game.random.random
+        self.can_shoot = (random()
+                          < ai_game.level_settings.alien_shooter_probability)
+        # Seconds between volleys; a formation can set it per column, so the
+        #  draw is kept to scale the first delay by the column's period.
+        self.cooldown_draw = random()
+        self.cooldown_period = self.settings.cooldown_period
+        self.shoot_cooldown = self.cooldown_draw * self.cooldown_period
 
         # Load the alien image and set its rect attribute.
         if self.can_shoot:
-            converter.convert_alien_color('images/alien.bmp',
-                                          'images/shooter_alien.bmp', 
-                                          self.settings.alien_color,
-                                          self.settings.alien_shooter_color,
-                                          self.settings.color_tolerance)
-            self.image = pygame.image.load('images/shooter_alien.bmp')
+            self.image = ai_game.assets.recolored_image(
+                'images/alien.bmp', self.settings.alien_color,
+                self.settings.alien_shooter_color,
+                self.settings.color_tolerance)
         else:
-            self.image = pygame.image.load('images/alien.bmp')
+            self.image = ai_game.assets.image('images/alien.bmp')
         self.rect = self.image.get_rect()
 
         # Start each new alien near the top left of the screen.
@@ -43,22 +41,16 @@ class Alien(Sprite):
     
     def check_edges(self):
         """Return True if alien is at edge of screen."""
-        screen_rect = self.screen.get_rect()
-        return (self.rect.right >= screen_rect.right) or (self.rect.left <= 0)
+        return ((self.rect.right >= self.settings.screen_width)
+                or (self.rect.left <= 0))
 
 
-    def update(self):
-        """Move the alien right or left."""
-        self.x += self.settings.alien_speed * self.settings.fleet_direction
+    def update(self, dx):
+        """Move the alien dx pixels right (or left, if dx is negative)."""
+        self.x += dx
         self.rect.x = self.x
 
 
     def shoot(self):
-        """Allow the alien to shoot if its cooldown has elapsed."""
-        if self.can_shoot and self.shoot_cooldown <= 0:
-            # Create a new bullet and add it to the alien bullets group.
-            new_alien_bullet = AlienBullet(self.ai_game, self)
-            self.ai_game.alien_bullets.add(new_alien_bullet)
-            
-            # Reset the cooldown period.
-            self.shoot_cooldown = self.settings.cooldown_period
\ No newline at end of file
+        """Fire a new bullet from the alien."""
+        self.ai_game.alien_bullets.fire(self)
\ No newline at end of file
@@ -1,5 +1,5 @@
 import pygame
-from pygame.sprite import Sprite
+from pygame.sprite import Sprite, Group
 
 class AlienBullet(Sprite):
     """A class to manage bullets fired from aliens."""
@@ -20,14 +20,77 @@ class AlienBullet(Sprite):
         self.y = float(self.rect.y)
     
 
-    def update(self):
-        """Move the bullet down the screen."""
+    def update(self, dy):
+        """Move the bullet dy pixels down the screen."""
         # Update the exact position of the bullet.
-        self.y += self.settings.alien_bullet_speed
+        self.y += dy
         # Update the rect position.
         self.rect.y = self.y
 
 
-    def draw_bullet(self):
-        """Draw the bullet to the screen."""
-        pygame.draw.rect(self.screen, self.color, self.rect)
\ No newline at end of file
+    def draw_bullet(self, offset_y=0):
+        """Draw the bullet to the screen, shifted down by offset_y."""
+        pygame.draw.rect(self.screen, self.color, self.rect.move(0, offset_y))
+
+class AlienBulletGroup(Group):
+    """A class to manage the bullets fired from aliens as sprites."""
+
+    def __init__(self, ai_game):
+        """Initialize an empty group of bullets."""
+        super().__init__()
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+
+
+    def fire(self, alien):
+        """Fire a new bullet from the alien's current position."""
+        self.add(AlienBullet(self.ai_game, alien))
+
+
+    def add_bullet_at(self, x, y):
+        """Add a bullet with its top left corner at (x, y)."""
+        # The bullet is moved straight away, so any sprite can fire it.
+        new_bullet = AlienBullet(self.ai_game, self.ai_game.ship)
+        new_bullet.rect.x = x
+        new_bullet.y = float(y)
+        new_bullet.rect.y = y
+        self.add(new_bullet)
+
+
+    def update(self):
+        """Move the bullets, and get rid of those that have disappeared."""
+        super().update(self.ai_game.level_settings.alien_bullet_step)
+        for alien_bullet in self.sprites():
+            if alien_bullet.rect.top >= self.settings.screen_height:
+                self.remove(alien_bullet)
+
+
+    def collide_rect(self, rect, dokill):
+        """Return how many bullets collide with rect."""
+        collisions = [alien_bullet for alien_bullet in self.sprites()
+                      if rect.colliderect(alien_bullet.rect)]
+        if dokill:
+            self.remove(collisions)
+        return len(collisions)
+
+
+    def collide_any(self, rect):
+        """Return True if any bullet collides with rect."""
+        return any(rect.colliderect(alien_bullet.rect)
+                   for alien_bullet in self.sprites())
+
+
+    def rects(self):
+        """Return a copy of every bullet's rect."""
+        return [alien_bullet.rect.copy() for alien_bullet in self.sprites()]
+
+
+    def positions(self):
+        """Return the (x, y) top left corner of every bullet."""
+        return [alien_bullet.rect.topleft for alien_bullet in self.sprites()]
+
+
+    def draw_bullets(self, offset_y=0):
+        """Draw every bullet to the screen, shifted down by offset_y."""
+        for alien_bullet in self.sprites():
+            alien_bullet.draw_bullet(offset_y)
@@ -1,34 +1,24 @@
-from PIL import Image
+import numpy as np
+import pygame
 
-def convert_alien_color(current_image_path, converted_image_path, 
-                        current_color, desired_color, tolerance):
-    """Convert the current alien color to the desired alien color."""
-
-    # Load the current alien image.
-    current_image = Image.open(current_image_path)
-
-    # Convert the image to RGB if it is not.
-    if current_image.mode != 'RGB':
-        current_image = current_image.convert('RGB')
-
-    # Access all the pixels of the image.
-    pixels = current_image.load()
+def recolor_surface(surface, current_color, desired_color, tolerance):
+    """
+    Return a copy of the surface with every pixel within the tolerance of the
+     current color replaced by the desired color.
+    """
+    # Work on a 32-bit copy so the pixels can be referenced as an array.
+    recolored = pygame.Surface(surface.get_size(), 0, 32)
+    recolored.blit(surface, (0, 0))
 
-    # Iterate over each pixel.
-    for i in range(current_image.width):
-        for j in range(current_image.height):
-            # If the pixel is within the tolerance of the current alien color,
-            #  replace it.
-            if _within_tolerance(pixels[i, j], current_color, tolerance):
-                pixels[i, j] = desired_color
+    # Compare every pixel with the current color in one operation.
+    pixels = pygame.surfarray.pixels3d(recolored)
+    difference = np.abs(pixels.astype(np.int16)
+                        - np.array(current_color[:3], dtype=np.int16))
+    within_tolerance = (difference <= tolerance).all(axis=2)
+    pixels[within_tolerance] = desired_color[:3]
 
-    # Save the modified image.
-    current_image.save(converted_image_path)
+    # Release the pixel array so the surface is unlocked.
+    del pixels
 
+    return recolored
 
-def _within_tolerance(current_pixel, target_color, tolerance):
-    """
-    Check if the current pixel is sufficiently different from the target color.
-    """
-    return all(abs(current_pixel[i] - target_color[i]) <= tolerance 
-               for i in range(3))
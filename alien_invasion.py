@@ -1,51 +1,152 @@
+import argparse
+import os
 import sys
-from time import sleep
+from random import Random
+from datetime import datetime
+from time import perf_counter
+
+# When the game started loading its modules, for the startup report.
+_IMPORT_START = perf_counter()
 
 import pygame
 
 from settings import Settings
-from sound_effects import SoundEffects
+from startup_timer import StartupTimer
+from asset_cache import AssetCache
+from assets import AssetRegistry
+from text_cache import TextCache
+from sound_effects import SoundEffects, NullSoundEffects
 from game_stats import GameStats
-from scoreboard import Scoreboard
 from button import Button
 from ship import Ship
-from ship_bullet import ShipBullet
-from alien import Alien
+from ship_bullet import ShipBulletGroup
+from alien_bullet import AlienBulletGroup
+from bullet_pool import ShipBulletPool, AlienBulletPool
 from shield import Shield
+from game_state import GameState
+from fleet import SpriteFleet, ArrayFleet
+from fleet_layout import FleetLayouts
+from difficulty import DifficultyTable, DIFFICULTIES
+from frame_governor import FrameGovernor
+import frame_timer
+from frame_timer import FrameTimer
+from renderer import Renderer
+import input_log
+from input_log import InputRecorder, InputReplay
+from controllers import AutopilotController
+from score_history import ScoreHistory
+
+_IMPORT_SECONDS = perf_counter() - _IMPORT_START
+
 
 class AlienInvasion:
     """Overall class to manage game assets and behavior."""
 
-    def __init__(self):
-        """Initialize the game, and create game resources."""
+    def __init__(self, headless=False, seed=None, settings=None,
+                 display=True):
+        """
+        Initialize the game, and create game resources.
+        A headless game runs without a display or audio device, and a seed
+         makes every run with the same inputs play out the same way.
+        Settings can be passed in to override the defaults.
+        A headless game without a display only simulates; it has no screen,
+         loads no fonts, and draws nothing.
+        """
+        # Time each phase of startup, for the startup report.
+        self.startup = StartupTimer(_IMPORT_SECONDS)
+
+        self.headless = headless
+        self.display = display or not headless
+        if self.headless:
+            # Use SDL's dummy drivers; they must be chosen before pygame.init().
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
         pygame.init()
+        self.startup.mark('pygame.init')
         self.clock = pygame.time.Clock()
-        self.settings = Settings()
+        self.settings = settings if settings is not None else Settings()
+
+        # A recorded session needs a known seed to be played out again.
+        if seed is None and self.settings.input_record_path:
+            seed = Random().getrandbits(63)
+        self.seed = seed
+        self.random = Random(seed)
 
-        self.sound_effects = SoundEffects()
+        # Simulation steps run so far; recorded inputs are tied to them.
+        self.steps = 0
 
-        self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-        self.settings.screen_width = self.screen.get_rect().width
-        self.settings.screen_height = self.screen.get_rect().height
-        pygame.display.set_caption("Alien Invasion")
+        # The simulation advances in fixed steps. Speeds are given per 1/60
+        #  of a second, so scale them to the length of a step.
+        self.settings.motion_scale = 60 / self.settings.simulation_rate
 
-        # Create an instance to store game statistics and create a scoreboard.
+        # Seconds simulated by each step.
+        self.frame_time = 1 / self.settings.simulation_rate
+
+        # The speeds and points of every level at each difficulty. Update
+        #  loops read the current level's read-only snapshot.
+        self.difficulty_table = DifficultyTable(self.settings)
+        self._apply_level('', 1)
+
+        # How far between the last two simulated states the screen is drawn,
+        #  from 0 (the previous state) to 1 (the latest state).
+        self.render_alpha = 1.0
+
+        # Derived images are kept on disk between runs if configured to.
+        if self.settings.asset_cache_dir:
+            self.assets = AssetRegistry(
+                AssetCache(self.settings.asset_cache_dir))
+        else:
+            self.assets = AssetRegistry()
+        self.text_cache = TextCache(self.settings.text_cache_size)
+        self.sound_effects = self._make_sound_effects()
+        self.startup.mark('sound')
+
+        if not self.display:
+            self.screen = None
+            screen_size = self.settings.headless_screen_size
+        else:
+            if self.headless:
+                self.screen = pygame.display.set_mode(
+                    self.settings.headless_screen_size)
+            else:
+                self.screen = pygame.display.set_mode((0, 0),
+                                                      pygame.FULLSCREEN)
+            screen_size = self.screen.get_size()
+            pygame.display.set_caption("Alien Invasion")
+        self.settings.screen_width, self.settings.screen_height = screen_size
+        self.startup.mark('display')
+
+        # Load the images once the display exists so they can be converted to
+        #  its pixel format.
+        self._preload_images()
+        self.startup.mark('images')
+
+        # Create an instance to store game statistics.
         self.stats = GameStats(self)
-        self.sb = Scoreboard(self)
 
         self.ship = Ship(self)
         self.shield = Shield(self)
-        self.ship_bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
-        self.alien_bullets = pygame.sprite.Group()
-
+        self._make_bullets()
+
+        # The next fleet is prepared during the last part of each level, so
+        #  it can be swapped in when the level ends.
+        self.next_fleet = None
+        self.next_fleet_positions = None
+        self.next_fleet_cooldowns = None
+        self.next_fleet_built = 0
+        self.fleet_layouts = FleetLayouts(self.settings.formations_file)
         self._create_fleet()
 
-        # Start Alien Invasion in an inactive state. 
-        # Initialize the selecting_difficulty attribute to False as the player
-        #  needs to click the Play button before selecting the difficulty level.
-        self.game_active = False
-        self.selecting_difficulty = False
+        # Start Alien Invasion at the menu, as the player needs to click the
+        #  Play button before selecting the difficulty level.
+        # Timed states, like the pause after the ship is hit, end once
+        #  state_time_left seconds of simulation have passed.
+        self.state = GameState.MENU
+        self.state_time_left = 0.0
+
+        # The step the current game started on, to log how long it lasted.
+        self.game_start_step = 0
 
         # Make the Play button.
         self.play_button = Button(self, "Play")
@@ -55,44 +156,254 @@ class AlienInvasion:
         self.medium_button = Button(self, 'Medium')
         self.hard_button = Button(self, 'Hard', 2)
 
+        # Record how long each phase of a frame takes.
+        self.frame_timer = FrameTimer(self,
+                                      self.settings.frame_timing_capacity)
+
+        # A Controller from controllers.py can play instead of the keyboard.
+        self.controller = None
+
+        # Ship bullets are checked against the fleet every collision_interval
+        #  steps. Only the frame governor of run_game changes it.
+        self.collision_interval = 1
+        self.governor = None
+
+        # Write the player's inputs to a file if configured to.
+        if self.settings.input_record_path:
+            self.recorder = InputRecorder(self.settings.input_record_path,
+                                          self.seed, self.settings)
+        else:
+            self.recorder = None
+
+        # Everything that draws to the screen, if there is one.
+        self.renderer = Renderer(self) if self.display else None
+        self.startup.mark('game objects')
+
+
+    def _preload_images(self):
+        """Load and convert every image the game draws."""
+        self.assets.convert_images()
+        self.assets.preload(image_paths=('images/ship.bmp', 'images/alien.bmp'))
+        self.assets.recolored_image('images/alien.bmp',
+                                    self.settings.alien_color,
+                                    self.settings.alien_shooter_color,
+                                    self.settings.color_tolerance)
+
+        if self.settings.report_asset_loads:
+            self.sound_effects.wait_until_loaded()
+            self.assets.print_report()
+
 
     def run_game(self):
-        """Start the main loop for the game."""
+        """
+        Start the main loop for the game.
+        The simulation runs in fixed steps of 1 / simulation_rate seconds,
+         however often the screen is drawn.
+        """
+        timer = self.frame_timer
+        step = 1 / self.settings.simulation_rate
+        max_steps = self.settings.max_steps_per_frame
+        accumulator = 0.0
+        previous_time = perf_counter()
+
+        # Give up quality, a tier at a time, if frames run over budget.
+        if self.settings.frame_governor:
+            self.governor = FrameGovernor(self)
+        frame = 0
+
         while True:
+            timer.start_frame()
             self._check_events()
+            timer.mark(frame_timer.EVENTS)
+
+            # Run as many steps as the time since the last frame covers.
+            now = perf_counter()
+            accumulator += now - previous_time
+            previous_time = now
+
+            steps = 0
+            while accumulator >= step and steps < max_steps:
+                self._step_simulation()
+                accumulator -= step
+                steps += 1
+            if steps == max_steps:
+                # Give up on time the simulation can't catch up with.
+                accumulator %= step
+
+            if self.settings.render_interpolation:
+                self.render_alpha = accumulator / step
+            if not self.governor or frame % self.governor.render_every == 0:
+                self._update_screen()
+                timer.mark(frame_timer.SCREEN)
+            timer.end_frame()
+            if self.governor:
+                self.governor.record_frame(timer.latest())
+            frame += 1
+
+            self.clock.tick(self.settings.frame_rate)
+
+
+    def run_frames(self, frames, render=True):
+        """
+        Run the given number of frames as fast as possible.
+        Every frame runs exactly one simulation step, so the result does not
+         depend on how fast the machine is. Only every render_every'th frame
+         is drawn.
+        """
+        render_every = self.settings.render_every
+        for frame in range(frames):
+            self._run_frame(render and frame % render_every == 0)
+            self.clock.tick()
+
+
+    def _run_frame(self, render=True):
+        """Respond to events, run one step, and redraw the screen."""
+        timer = self.frame_timer
+        timer.start_frame()
 
-            if self.game_active:
-                self.ship.update()
-                self._update_ship_bullets()
-                self._update_aliens()
-                self._update_alien_bullets()
-            
+        self._check_events()
+        timer.mark(frame_timer.EVENTS)
+
+        self._step_simulation()
+
+        if render and self.renderer:
             self._update_screen()
-            self.clock.tick(60)
+            timer.mark(frame_timer.SCREEN)
+
+        timer.end_frame()
+
+
+    @property
+    def game_active(self):
+        """True while a game is in progress, including respawn pauses."""
+        return self.state in (GameState.PLAYING, GameState.RESPAWN_PAUSE)
+
+
+    def _set_state(self, state, duration=0.0):
+        """Move to a new state, which ends after duration seconds if given."""
+        self.state = state
+        self.state_time_left = duration
+
+
+    def run_replay(self, replay, render=True):
+        """
+        Play out a recorded session as fast as possible, one step per frame.
+        Return the number of frames run.
+        """
+        frames = 0
+        timer = self.frame_timer
+        render_every = self.settings.render_every
+        for _, events in replay.steps():
+            timer.start_frame()
+            for event in events:
+                # A recorded Q press is where the player quit.
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_q:
+                    return frames
+                if event.type == input_log.DIFFICULTY_SELECTED:
+                    self.select_difficulty(event.difficulty)
+                elif event.type == input_log.CONTROLLER_ACTION:
+                    self._replay_action(event)
+                else:
+                    self._handle_event(event)
+            timer.mark(frame_timer.EVENTS)
+
+            self._step_simulation()
+
+            if render and self.renderer and frames % render_every == 0:
+                self._update_screen()
+                timer.mark(frame_timer.SCREEN)
+
+            timer.end_frame()
+            self.clock.tick()
+            frames += 1
+        return frames
+
+
+    def _replay_action(self, event):
+        """Carry out an action a controller took in a recorded session."""
+        if event.action == input_log.STEER:
+            self.ship.moving_left = event.direction < 0
+            self.ship.moving_right = event.direction > 0
+        elif event.action == input_log.FIRE:
+            self._fire_ship_bullet()
+        elif event.action == input_log.SHIELD:
+            self.shield.deploy_shield()
+
+
+    def _step_simulation(self):
+        """Advance the game by one fixed step."""
+        self.steps += 1
+
+        if self.state is GameState.RESPAWN_PAUSE:
+            # Nothing moves until the pause is over.
+            self.state_time_left -= self.frame_time
+            if self.state_time_left <= 0:
+                self._set_state(GameState.PLAYING)
+            return
+
+        if self.state is not GameState.PLAYING:
+            return
+
+        if self.controller:
+            self.controller.control(self)
+
+        timer = self.frame_timer
+        self.ship.update()
+        timer.mark(frame_timer.SHIP)
+        self._update_ship_bullets()
+        timer.mark(frame_timer.SHIP_BULLETS)
+        self._update_aliens()
+        timer.mark(frame_timer.ALIENS)
+        self._update_alien_bullets()
+        self._check_fleet_prefetch()
+        timer.mark(frame_timer.ALIEN_BULLETS)
 
     
     def _check_events(self):
         """Respond to keypresses and mouse events."""
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self._quit_game()
-            elif event.type == pygame.KEYDOWN:
-                self._check_keydown_events(event)
-            elif event.type == pygame.KEYUP:
-                self._check_keyup_events(event)
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                if not self.game_active and not self.selecting_difficulty:
-                    self._check_play_button(mouse_pos)
-                elif self.selecting_difficulty:
-                    self._check_difficulty_button(mouse_pos)
+            if self.recorder:
+                self.recorder.record(self.steps, event)
+            self._handle_event(event)
+
+
+    def _handle_event(self, event):
+        """Respond to a single event."""
+        if event.type == pygame.QUIT:
+            self._quit_game()
+        elif event.type == pygame.KEYDOWN:
+            self._check_keydown_events(event)
+        elif event.type == pygame.KEYUP:
+            self._check_keyup_events(event)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            mouse_pos = event.pos
+            if self.state in (GameState.MENU, GameState.GAME_OVER):
+                self._check_play_button(mouse_pos)
+            elif self.state is GameState.DIFFICULTY_SELECT:
+                self._check_difficulty_button(mouse_pos)
+        elif event.type == pygame.WINDOWEXPOSED:
+            if self.renderer:
+                self.renderer.request_full_redraw()
 
 
     def _quit_game(self):
         """Exit the game."""
+        # Quitting in the middle of a game ends it.
+        if self.game_active:
+            self._end_game()
+        self.stats.close_history()
         self.stats.write_high_score()
+        self._write_frame_timings()
+        if self.recorder:
+            self.recorder.close(self.steps)
         sys.exit()
 
+
+    def _write_frame_timings(self):
+        """Write the recorded frame timings if a CSV file is configured."""
+        if self.settings.frame_timing_csv:
+            self.frame_timer.write_csv(self.settings.frame_timing_csv)
+
     
     def _check_play_button(self, mouse_pos):
         """
@@ -102,29 +413,44 @@ class AlienInvasion:
         """
         play_button_clicked = self.play_button.rect.collidepoint(mouse_pos)
         if play_button_clicked and not self.game_active:
-            self.selecting_difficulty = True
+            self._set_state(GameState.DIFFICULTY_SELECT)
 
 
     def _check_difficulty_button(self, mouse_pos):
         """
         Check which difficulty level the player selects.
-        Reset the selecting_difficulty attribute to False once a choice is made.
+        Go back to the menu if the click missed every button.
         """
-        if self.selecting_difficulty:
+        if self.state is GameState.DIFFICULTY_SELECT:
 
             if self.easy_button.rect.collidepoint(mouse_pos):
-                self.settings.initialize_dynamic_settings('easy')
-                self._start_game()
+                self._select_difficulty('easy')
+
+            elif self.medium_button.rect.collidepoint(mouse_pos):
+                self._select_difficulty()
 
-            if self.medium_button.rect.collidepoint(mouse_pos):
-                self.settings.initialize_dynamic_settings()
-                self._start_game()
+            elif self.hard_button.rect.collidepoint(mouse_pos):
+                self._select_difficulty('hard')
 
-            if self.hard_button.rect.collidepoint(mouse_pos):
-                self.settings.initialize_dynamic_settings('hard')
-                self._start_game()
-            
-            self.selecting_difficulty = False
+            else:
+                self._set_state(GameState.MENU)
+
+
+    def select_difficulty(self, difficulty_level=''):
+        """
+        Start a new game at the given difficulty level without the buttons,
+         as scripts and headless games do.
+        """
+        if self.recorder:
+            self.recorder.record_difficulty(self.steps, difficulty_level)
+        self._select_difficulty(difficulty_level)
+
+
+    def _select_difficulty(self, difficulty_level=''):
+        """Start a new game at the given difficulty level."""
+        self.settings.initialize_dynamic_settings(difficulty_level)
+        self._apply_level(difficulty_level, 1)
+        self._start_game()
 
 
     def _start_game(self):
@@ -132,13 +458,15 @@ class AlienInvasion:
         if not self.game_active:
             # Reset the game statistics.
             self.stats.reset_stats()
-            self.sb.prep_images()
-            self.game_active = True
+            self._set_state(GameState.PLAYING)
+            self.game_start_step = self.steps
 
-            # Get rid of any remaining bullets and aliens.
+            # Get rid of any remaining bullets and aliens. A prepared fleet
+            #  used the last game's settings, so it goes too.
             self.ship_bullets.empty()
             self.alien_bullets.empty()
             self.aliens.empty()
+            self.next_fleet = None
 
             # Create a new fleet and center the ship.
             self._create_fleet()
@@ -157,13 +485,15 @@ class AlienInvasion:
         elif event.key == pygame.K_q:
             self._quit_game()
         elif event.key == pygame.K_SPACE:
-            if self.game_active:
+            if self.state is GameState.PLAYING:
                 self._fire_ship_bullet()
         elif event.key == pygame.K_s:
-            if self.game_active:
+            if self.state is GameState.PLAYING:
                 self.shield.deploy_shield()
         elif event.key == pygame.K_p:
             self._start_game()
+        elif event.key == pygame.K_F3:
+            self.frame_timer.toggle_overlay()
 
 
     def _check_keyup_events(self, event):
@@ -177,8 +507,7 @@ class AlienInvasion:
     def _fire_ship_bullet(self):
         """Create a new bullet and add it the bullets group."""
         if len(self.ship_bullets) < self.settings.ship_bullets_allowed:
-            new_ship_bullet = ShipBullet(self)
-            self.ship_bullets.add(new_ship_bullet)
+            self.ship_bullets.fire()
             self.sound_effects.play_shooting_sound()
 
 
@@ -187,44 +516,61 @@ class AlienInvasion:
         Update position of bullets from the ship.
         Get rid of old bullets.
         """
-        # Update bullet positions.
+        # Update bullet positions, and get rid of bullets that have
+        #  disappeared.
         self.ship_bullets.update()
 
-        # Get rid of bullets that have disappeared.
-        for ship_bullet in self.ship_bullets.copy():
-            if ship_bullet.rect.bottom <= 0:
-                self.ship_bullets.remove(ship_bullet)
-
-        self._check_bullet_alien_collisions()
+        # Bullets are only checked less often while they can't pass through
+        #  an alien between checks.
+        interval = self.collision_interval
+        if (self.level_settings.ship_bullet_step * interval
+                > self.assets.image('images/alien.bmp').get_height()):
+            interval = 1
+        if self.steps % interval == 0:
+            self._check_bullet_alien_collisions()
         
     
     def _check_bullet_alien_collisions(self):
         """Respond to bullet-alien collisions."""
         # Remove any bullets and aliens that have collided.
-        collisions = pygame.sprite.groupcollide(self.ship_bullets, self.aliens,
-                                                True, True)
+        collisions = self.ship_bullets.collide_fleet(self.aliens)
         
         if collisions:
             for aliens in collisions.values():
-                self.stats.score += self.settings.alien_points * len(aliens)
-            self.sb.prep_score()
-            self.sb.check_high_score()
+                self.stats.score += self.level_settings.alien_points * len(aliens)
+            self.stats.check_high_score()
             self.sound_effects.play_alien_explosion_sound()
 
         if not self.aliens:
-            # Destroy existing bullets and create new fleet.
-            self.ship_bullets.empty()
-            self._create_fleet()
-            self.settings.increase_speed()
+            self._level_up()
+
+
+    def _level_up(self):
+        """Replace the destroyed fleet and move on to the next level."""
+        start = perf_counter()
+
+        # Destroy existing bullets and create new fleet.
+        self.ship_bullets.empty()
+        self._create_fleet()
+        self._apply_level(self.settings.difficulty_level,
+                          self.stats.level + 1)
+
+        # Increase level.
+        self._new_level()
+
+        self.frame_timer.record_level_transition(perf_counter() - start)
 
-            # Increase level.
-            self._new_level()
+
+    def _apply_level(self, difficulty_level, number):
+        """Switch to the settings of a level at a difficulty."""
+        self.level_settings = self.difficulty_table.level(difficulty_level,
+                                                          number)
+        self.settings.apply_level(self.level_settings)
 
 
     def _new_level(self):
         """Start a new level."""
         self.stats.level += 1
-        self.sb.prep_level()
         self.shield.reset_shield()
 
     
@@ -235,16 +581,11 @@ class AlienInvasion:
 
         self._check_shield_alien_collisions()
 
-        # Get the time passed since last call (frame).
-        time_passed = self.clock.get_time() / 1000.0
-
-        # Allow for the aliens to shoot.
-        for alien in self.aliens.sprites():
-            alien.shoot_cooldown -= time_passed
-            alien.shoot()
+        # Let the shooters whose turn has come shoot.
+        self.aliens.fire()
 
         # Look for alien-ship collisions.
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        if self.aliens.collide_any(self.ship):
             self._ship_hit()
 
         # Look for aliens hitting the bottom of the screen.
@@ -254,94 +595,150 @@ class AlienInvasion:
     def _check_shield_alien_collisions(self):
         # Remove any bullets that have collided with the shield.
         # The shield is hit if an alien collides with it.
-        collisions = pygame.sprite.spritecollide(self.shield, self.aliens, True)
+        if not self.shield.in_play():
+            return
+
+        collisions = self.aliens.collide_sprite(self.shield, True)
         
         if collisions:
             for collision in collisions:
                 self.shield.hit()
-                self.stats.score += self.settings.alien_points
-            self.sb.prep_score()
-            self.sb.check_high_score()
+                self.stats.score += self.level_settings.alien_points
+            self.stats.check_high_score()
             self.sound_effects.play_alien_explosion_sound()
 
         if not self.aliens:
-            # Destroy existing bullets and create new fleet.
-            self.ship_bullets.empty()
-            self._create_fleet()
-            self.settings.increase_speed()
-
-            # Increase level.
-            self._new_level()
+            self._level_up()
 
 
     def _update_alien_bullets(self):
         """Update position of bullets from the aliens."""
-        # Update bullet positions.
+        # Update bullet positions, and get rid of bullets that have
+        #  disappeared.
         self.alien_bullets.update()
 
-        # Get rid of bullets that have disappeared.
-        for alien_bullet in self.alien_bullets.copy():
-            if alien_bullet.rect.top >= self.settings.screen_height:
-                self.alien_bullets.remove(alien_bullet)
-
         self._check_bullet_shield_collision()
         self._check_bullet_ship_collision()
 
 
     def _check_bullet_shield_collision(self):
         """Respond to bullet-shield collisions."""
-        collisions = pygame.sprite.spritecollide(self.shield, 
-                                                 self.alien_bullets, True)
-        for collision in collisions:
+        if not self.shield.in_play():
+            return
+
+        collisions = self.alien_bullets.collide_rect(self.shield.rect, True)
+        for collision in range(collisions):
             self.shield.hit()
 
 
     def _check_bullet_ship_collision(self):
         """Respond to bullet-ship collisions."""
         # Remove any bullets and ships that have collided.
-        if pygame.sprite.spritecollideany(self.ship, self.alien_bullets):
+        if self.alien_bullets.collide_any(self.ship.rect):
             self._ship_hit()
 
 
+    def _make_sound_effects(self):
+        """
+        Return the sound effects using the configured backend. Headless games,
+         and games without a working mixer, play nothing.
+        """
+        if (self.headless or self.settings.sound_backend == 'null'
+                or not pygame.mixer.get_init()):
+            return NullSoundEffects()
+        return SoundEffects(self)
+
+
+    def _make_fleet(self):
+        """Return an empty fleet using the configured backend."""
+        if self.settings.fleet_backend == 'array':
+            return ArrayFleet(self)
+        return SpriteFleet(self)
+
+
+    def _make_bullets(self):
+        """Create empty ship and alien bullets using the configured backend."""
+        if self.settings.bullet_backend == 'pool':
+            self.ship_bullets = ShipBulletPool(self)
+            self.alien_bullets = AlienBulletPool(self)
+        else:
+            self.ship_bullets = ShipBulletGroup(self)
+            self.alien_bullets = AlienBulletGroup(self)
+
+
     def _create_fleet(self):
-        """Create the fleet of aliens."""
-        # Create an alien and keep adding aliens until there's no room left.
-        # Spacing between aliens is one alien width.
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-
-        current_x, current_y = alien_width, alien_height
-        while current_y < (self.settings.screen_height - 3 * alien_height):
-            while current_x < (self.settings.screen_width - 2 * alien_width):
-                self._create_alien(current_x, current_y)
-                current_x += 2 * alien_width
-        
-            # Finished a row; reset x value, and increment y value.
-            current_x = alien_width
-            current_y += 2 * alien_height
+        """Replace the fleet with the prepared fleet, or a new one."""
+        if self.next_fleet is None:
+            self.aliens = self._build_fleet()
+        else:
+            # Add whatever the prepared fleet is still missing.
+            self._spawn_next_fleet(len(self.next_fleet_positions))
+            self.aliens = self.next_fleet
+            self.next_fleet = None
+        self.fleet_size = len(self.aliens)
 
 
-    def _create_alien(self, x_position, y_position):
-        """Create an alien and place it in the row."""
-        new_alien = Alien(self)
-        new_alien.x = x_position
-        new_alien.rect.x = x_position
-        new_alien.rect.y = y_position
-        self.aliens.add(new_alien)
+    def _check_fleet_prefetch(self):
+        """
+        Prepare the next fleet once the current fleet is nearly gone. The
+         fleet is built a chunk at a time, over fleet_prefetch_steps steps, so
+         no single step has to build all of it.
+        """
+        if self.next_fleet is None:
+            if (len(self.aliens) >
+                    self.fleet_size * self.settings.fleet_prefetch_fraction):
+                return
+            self.next_fleet = self._make_fleet()
+            (self.next_fleet_positions,
+             self.next_fleet_cooldowns) = self._fleet_layout()
+            self.next_fleet_built = 0
+
+        total = len(self.next_fleet_positions)
+        if self.next_fleet_built == total:
+            return
+        chunk = -(-total // self.settings.fleet_prefetch_steps)
+        self._spawn_next_fleet(min(self.next_fleet_built + chunk, total))
+
+
+    def _spawn_next_fleet(self, end):
+        """Add the prepared fleet's aliens, up to the one numbered end."""
+        start = self.next_fleet_built
+        cooldowns = self.next_fleet_cooldowns
+        if cooldowns is not None:
+            cooldowns = cooldowns[start:end]
+        self.next_fleet.spawn(self.next_fleet_positions[start:end], cooldowns)
+        self.next_fleet_built = end
+
+
+    def _build_fleet(self):
+        """Return a new, full fleet of aliens."""
+        fleet = self._make_fleet()
+        fleet.spawn(*self._fleet_layout())
+        return fleet
+
+
+    def _fleet_layout(self):
+        """
+        Return the (x, y) position of every alien in a full fleet, and the
+         cooldown of each, or None if the formation leaves it to settings.
+        """
+        layouts = self.fleet_layouts
+        formation = self.settings.fleet_formation
+        screen_size = (self.settings.screen_width, self.settings.screen_height)
+        alien_size = self.assets.image('images/alien.bmp').get_size()
+        return (layouts.positions(formation, screen_size, alien_size),
+                layouts.cooldowns(formation, screen_size, alien_size))
 
     
     def _check_fleet_edges(self):
         """Respond appropriately if any aliens have reached an edge."""
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        if self.aliens.at_edge():
+            self._change_fleet_direction()
 
 
     def _change_fleet_direction(self):
         """Drop the entire fleet and change the fleet's direction."""
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
+        self.aliens.drop(self.settings.fleet_drop_speed)
         self.settings.fleet_direction *= -1
 
     
@@ -355,7 +752,6 @@ class AlienInvasion:
         if self.stats.ships_left > 0:
             # Decrement ships_left.
             self.stats.ships_left -= 1
-            self.sb.prep_ships()
 
             # Get rid of any remaining bullets and aliens.
             self.ship_bullets.empty()
@@ -365,55 +761,238 @@ class AlienInvasion:
             self._create_fleet()
             self.ship.center_ship()
 
-            # Pause.
-            sleep(2)
+            # Pause before the next ship comes in. The game keeps handling
+            #  events and drawing while it waits.
+            self._set_state(GameState.RESPAWN_PAUSE,
+                            self.settings.respawn_pause)
         else:
-            self.game_active = False
+            self._end_game()
+            self._set_state(GameState.GAME_OVER)
             pygame.mouse.set_visible(True)
 
 
+    def _end_game(self):
+        """Log the game that just ended."""
+        self.stats.record_game(self.steps - self.game_start_step, self.seed)
+
+
     def _check_aliens_bottom(self):
         """Check if any aliens have reached the bottom of the screen."""
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= self.settings.screen_height:
-                # Treat this the same as if the ship got hit.
-                self._ship_hit()
-                break
+        if self.aliens.reached_bottom(self.settings.screen_height):
+            # Treat this the same as if the ship got hit.
+            self._ship_hit()
 
 
     def _update_screen(self):
-        """Update images on the screen, and flip to the new screen."""
-        self.screen.fill(self.settings.bg_color)
-        for ship_bullet in self.ship_bullets.sprites():
-            ship_bullet.draw_bullet()
-        self.ship.blitme()
-
-        # Draw the shield if it's active.
-        self.shield.draw()
-
-        # Draw the shield availability status.
-        if self.shield.shield_available:
-            self.shield.draw_availability_status()
-
-        self.aliens.draw(self.screen)
-        for alien_bullet in self.alien_bullets.sprites():
-            alien_bullet.draw_bullet()
-
-        # Draw the score information.
-        self.sb.show_score()
-
-
-        # Draw the play button if the game is inactive.
-        if not self.game_active:
-            self.play_button.draw_button()
-            if self.selecting_difficulty:
-                self.easy_button.draw_button()
-                self.medium_button.draw_button()
-                self.hard_button.draw_button()
+        """Draw the screen, if the game has a renderer."""
+        if self.renderer:
+            self.renderer.render()
+
+
+def _parse_args():
+    """Parse the command line options."""
+    parser = argparse.ArgumentParser(description="Play Alien Invasion.")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without a display or audio device")
+    parser.add_argument('--no-display', action='store_true',
+                        help="only simulate a headless game, drawing nothing")
+    parser.add_argument('--render-every', type=int,
+                        help="draw only every Nth frame of a headless game")
+    parser.add_argument('--seed', type=int,
+                        help="seed for the game's random numbers")
+    parser.add_argument('--frames', type=int, default=3600,
+                        help="number of frames to run headless")
+    parser.add_argument('--difficulty', choices=DIFFICULTIES,
+                        default='medium', help="difficulty of a headless game")
+    parser.add_argument('--fleet-backend', choices=('sprites', 'array'),
+                        default='sprites', help="how the fleet is stored")
+    parser.add_argument('--bullet-backend', choices=('sprites', 'pool'),
+                        default='sprites', help="how bullets are stored")
+    parser.add_argument('--formation', default='grid',
+                        help="formation of the fleet, from formations.json")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="redraw only the parts of the screen that change")
+    parser.add_argument('--frame-rate', type=int,
+                        help="screens drawn per second (0 for uncapped)")
+    parser.add_argument('--simulation-rate', type=int,
+                        help="simulation steps per second")
+    parser.add_argument('--no-governor', action='store_true',
+                        help="keep full quality even when frames run slow")
+    parser.add_argument('--frame-budget', type=float, metavar='MS',
+                        help="milliseconds a frame may take before the "
+                             "governor gives up quality")
+    parser.add_argument('--frame-csv',
+                        help="write the recent frame timings to this CSV file")
+    parser.add_argument('--autopilot', action='store_true',
+                        help="let the built-in autopilot play")
+    parser.add_argument('--record',
+                        help="record the session's inputs to this file")
+    parser.add_argument('--replay',
+                        help="play out a recorded session headless")
+    parser.add_argument('--asset-cache', metavar='DIRECTORY',
+                        help="keep derived images in this directory")
+    parser.add_argument('--bake-assets', action='store_true',
+                        help="fill the asset cache and quit")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="time each phase of startup and quit")
+    parser.add_argument('--leaderboard', action='store_true',
+                        help="print the best games at each difficulty")
+    parser.add_argument('--difficulty-table', action='store_true',
+                        help="print the settings of the first levels at each "
+                             "difficulty")
+    args = parser.parse_args()
+
+    # Seeds are saved with the score history and in recordings as signed
+    #  64-bit numbers, where -1 means there wasn't one.
+    if args.seed is not None and not 0 <= args.seed < 2 ** 63:
+        parser.error(f"argument --seed: must be from 0 to {2 ** 63 - 1}")
+
+    # Formations come from a file, so they're checked once it's read.
+    formations = FleetLayouts(Settings().formations_file).formations
+    if args.formation not in formations:
+        parser.error(f"argument --formation: invalid choice: "
+                     f"{args.formation!r} (choose from "
+                     f"{', '.join(map(repr, formations))})")
+    return args
+
+
+def _make_settings(args):
+    """Return the settings chosen on the command line."""
+    settings = Settings()
+    settings.frame_timing_csv = args.frame_csv
+    settings.input_record_path = args.record
+    settings.fleet_backend = args.fleet_backend
+    settings.bullet_backend = args.bullet_backend
+    settings.fleet_formation = args.formation
+    settings.dirty_rect_rendering = args.dirty_rects
+    settings.frame_governor = not args.no_governor
+    if args.frame_budget is not None:
+        settings.frame_budget = args.frame_budget / 1000
+    if args.asset_cache:
+        settings.asset_cache_dir = args.asset_cache
+    if args.frame_rate is not None:
+        settings.frame_rate = args.frame_rate
+    if args.simulation_rate is not None:
+        settings.simulation_rate = args.simulation_rate
+    if args.render_every is not None:
+        settings.render_every = args.render_every
+    return settings
+
+
+def _run_headless(args):
+    """Run a headless game for a number of frames and report on it."""
+    ai = AlienInvasion(headless=True, seed=args.seed,
+                       settings=_make_settings(args),
+                       display=not args.no_display)
+    if args.autopilot:
+        ai.controller = AutopilotController()
+    ai.select_difficulty(args.difficulty)
+
+    start = perf_counter()
+    ai.run_frames(args.frames)
+    elapsed = perf_counter() - start
+    if ai.recorder:
+        ai.recorder.close(ai.steps)
+
+    _report(ai, args.frames, elapsed)
+
+
+def _run_replay(args):
+    """Play out a recorded session headless and report on it."""
+    replay = InputReplay(args.replay)
+    settings = _make_settings(args)
+    replay.apply_to(settings)
+    ai = AlienInvasion(headless=True, seed=replay.seed, settings=settings,
+                       display=not args.no_display)
+
+    start = perf_counter()
+    frames = ai.run_replay(replay)
+    elapsed = perf_counter() - start
+
+    _report(ai, frames, elapsed)
+
+
+def _bake_assets(args):
+    """Compute every derived image and store it in the asset cache."""
+    settings = _make_settings(args)
+    settings.asset_cache_dir = settings.asset_cache_dir or '.asset_cache'
+    ai = AlienInvasion(headless=True, settings=settings, display=False)
+
+    cache = ai.assets.cache
+    print(f"Baked {cache.misses} images into {cache.directory} "
+          f"({cache.hits} were already up to date).")
+
+
+def _report_startup(args):
+    """Start the game, draw the first frame, and report the time taken."""
+    ai = AlienInvasion(headless=args.headless, seed=args.seed,
+                       settings=_make_settings(args))
+    ai._update_screen()
+    ai.startup.mark('first frame')
+    print('\n'.join(ai.startup.lines()))
+
+
+def _print_leaderboard(settings):
+    """Print the best games at each difficulty from the score history."""
+    history = ScoreHistory(settings.score_history_dir,
+                           settings.leaderboard_size)
+    for difficulty in DIFFICULTIES:
+        print(f"{difficulty.title()}:")
+        for place, game in enumerate(history.top(difficulty), 1):
+            played = datetime.fromtimestamp(game.timestamp)
+            print(f"{place:>4}. {game.score:>10,}  level {game.level:<3} "
+                  f"{game.frames / settings.simulation_rate:8.0f} s  "
+                  f"{played:%Y-%m-%d %H:%M}")
+    history.close()
+
+
+def _print_difficulty_table(settings):
+    """Print the settings of the first levels at each difficulty."""
+    table = DifficultyTable(settings)
+    for difficulty in DIFFICULTIES:
+        print(f"{difficulty.title()}:")
+        print('\n'.join(table.lines(difficulty)))
+
+
+def _report(ai, frames, elapsed):
+    """Print how a headless game went and write its frame timings."""
+    print(f"Ran {frames} frames in {elapsed:.3f} s "
+          f"({frames / elapsed:.1f} frames/s).")
+    print(f"Score: {ai.stats.score}, level: {ai.stats.level}, "
+          f"ships left: {ai.stats.ships_left}, "
+          f"state: {ai.state.value}")
+
+    if ai.settings.bullet_backend == 'pool':
+        print(f"Ship bullet pool: {ai.ship_bullets.stats()}")
+        print(f"Alien bullet pool: {ai.alien_bullets.stats()}")
+    transitions = ai.frame_timer.level_transitions
+    if transitions:
+        print(f"Level transitions: {len(transitions)}, "
+              f"max {max(transitions) * 1000:.3f} ms")
+
+    total_ms = ai.frame_timer.percentiles()['total']
+    print("Frame time p50/p95/p99: " +
+          '/'.join(f"{ms:.3f}" for ms in total_ms) + " ms")
+    ai._write_frame_timings()
 
-        pygame.display.flip()
 
 if __name__ == '__main__':
-    # Make a game instance, and run the game.
-    ai = AlienInvasion()
-    ai.run_game()
\ No newline at end of file
+    args = _parse_args()
+    if args.leaderboard:
+        _print_leaderboard(_make_settings(args))
+    elif args.difficulty_table:
+        _print_difficulty_table(_make_settings(args))
+    elif args.bake_assets:
+        _bake_assets(args)
+    elif args.startup_report:
+        _report_startup(args)
+    elif args.replay:
+        _run_replay(args)
+    elif args.headless:
+        _run_headless(args)
+    else:
+        # Make a game instance, and run the game.
+        ai = AlienInvasion(seed=args.seed, settings=_make_settings(args))
+        if args.autopilot:
+            ai.controller = AutopilotController()
+        ai.run_game()
\ No newline at end of file
@@ -0,0 +1,85 @@
+from hashlib import sha256
+from mmap import mmap, ACCESS_READ
+from pathlib import Path
+import os
+import struct
+
+import pygame
+
+# Cached surfaces start with a header: a magic number, the format version,
+#  the size of the image, and whether it has per-pixel alpha. The pixels
+#  follow as RGB or RGBA bytes.
+MAGIC = b'AIAC'
+VERSION = 1
+HEADER = struct.Struct('<4sHHHB')
+
+
+class AssetCache:
+    """
+    A class to store derived images, like recolored aliens, on disk, so they
+     don't have to be computed again on the next start.
+    Each entry is keyed by a hash of the cache version, the recipe that made
+     it and the contents of its source files, so changing any of them simply
+     misses the cache. Entries are read through memory maps.
+    """
+
+    def __init__(self, directory):
+        """Use the given directory for the cache, creating it if needed."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+
+    def key(self, recipe, source_paths):
+        """Return the cache key of an asset made by recipe from the sources."""
+        digest = sha256(f"{VERSION}:{recipe!r}".encode())
+        for path in source_paths:
+            digest.update(Path(path).read_bytes())
+        return digest.hexdigest()
+
+
+    def load(self, key):
+        """Return the cached surface for key, or None if it isn't cached."""
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = mmap(f.fileno(), 0, access=ACCESS_READ)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if len(data) < HEADER.size:
+            self.misses += 1
+            return None
+        magic, version, width, height, alpha = HEADER.unpack_from(data)
+        fmt = 'RGBA' if alpha else 'RGB'
+        if (magic != MAGIC or version != VERSION
+                or len(data) != HEADER.size + width * height * len(fmt)):
+            self.misses += 1
+            return None
+
+        # The surface uses the mapped pixels directly, without a copy.
+        self.hits += 1
+        pixels = memoryview(data)[HEADER.size:]
+        return pygame.image.frombuffer(pixels, (width, height), fmt)
+
+
+    def store(self, key, surface):
+        """Write surface to the cache under key."""
+        alpha = surface.get_alpha() is not None
+        fmt = 'RGBA' if alpha else 'RGB'
+        width, height = surface.get_size()
+        path = self._path(key)
+
+        # Write to a temporary file first, so a reader never sees half an
+        #  entry.
+        temporary_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temporary_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, width, height, alpha))
+            f.write(pygame.image.tobytes(surface, fmt))
+        os.replace(temporary_path, path)
+
+
+    def _path(self, key):
+        """Return the path of the cache entry for key."""
+        return self.directory / f"{key}.surface"
@@ -0,0 +1,143 @@
+from time import perf_counter
+
+import pygame
+from pygame import mixer
+
+class AssetRegistry:
+    """A class to load the game's images and sounds once and share them."""
+
+    def __init__(self, cache=None):
+        """
+        Initialize the registry with no assets loaded.
+        Derived images are read from and written to cache, an AssetCache, if
+         one is given.
+        """
+        self.images = {}
+        self.sounds = {}
+        self.cache = cache
+
+        # Seconds spent loading (and converting) each asset, keyed like the
+        #  asset dictionaries above.
+        self.load_times = {}
+
+
+    def preload(self, image_paths=(), sound_paths=()):
+        """Load the given images and sounds ahead of their first use."""
+        for path in image_paths:
+            self.image(path)
+        for path in sound_paths:
+            self.sound(path)
+
+
+    def image(self, path):
+        """Return the shared surface for the image at path."""
+        image = self.images.get(path)
+        if image is None:
+            start = perf_counter()
+            image = self._convert(pygame.image.load(path))
+            self._store(self.images, path, image, start)
+        return image
+
+
+    def recolored_image(self, path, current_color, desired_color, tolerance):
+        """Return the shared surface for a recolored copy of an image."""
+        key = (path, tuple(current_color), tuple(desired_color), tolerance)
+        image = self.images.get(key)
+        if image is None:
+            start = perf_counter()
+            image = self._convert(self._cached(('recolor',) + key, (path,),
+                                               lambda: self._recolor(key)))
+            self._store(self.images, key, image, start)
+        return image
+
+
+    def sound(self, path):
+        """Return the shared Sound for the sound file at path."""
+        sound = self.sounds.get(path)
+        if sound is None:
+            start = perf_counter()
+            sound = mixer.Sound(path)
+            self._store(self.sounds, path, sound, start)
+        return sound
+
+
+    def convert_images(self):
+        """
+        Convert every loaded image to the display format.
+        Images loaded before the display was created are left in their file
+         format, so call this once the display exists.
+        """
+        for key, image in self.images.items():
+            self.images[key] = self._convert(image)
+
+
+    def report(self):
+        """Return (kind, name, load seconds, bytes) for every loaded asset."""
+        rows = []
+        for key, image in self.images.items():
+            size = image.get_pitch() * image.get_height()
+            rows.append(('image', self._name(key), self.load_times[key], size))
+        for key, sound in self.sounds.items():
+            size = len(sound.get_raw())
+            rows.append(('sound', self._name(key), self.load_times[key], size))
+        return rows
+
+
+    def print_report(self):
+        """Print the load time and memory used by every loaded asset."""
+        rows = self.report()
+        for kind, name, seconds, size in rows:
+            print(f"{kind:<6} {name:<60} {seconds * 1000:8.2f} ms "
+                  f"{size / 1024:10.1f} KiB")
+        total_seconds = sum(row[2] for row in rows)
+        total_size = sum(row[3] for row in rows)
+        print(f"{'total':<67} {total_seconds * 1000:8.2f} ms "
+              f"{total_size / 1024:10.1f} KiB")
+
+
+    def _store(self, assets, key, asset, start):
+        """Store a freshly loaded asset with its load time."""
+        assets[key] = asset
+        self.load_times[key] = perf_counter() - start
+
+
+    def _convert(self, image):
+        """Convert the image to the display format if a display exists."""
+        if pygame.display.get_surface() is None:
+            return image
+        if image.get_alpha() is not None:
+            return image.convert_alpha()
+        return image.convert()
+
+
+    def _recolor(self, key):
+        """Return a freshly recolored copy of an image."""
+        # The converter needs NumPy, so it's only imported when an image is
+        #  actually recolored rather than read from the cache.
+        import alien_color_converter as converter
+        path, current_color, desired_color, tolerance = key
+        return converter.recolor_surface(self.image(path), current_color,
+                                         desired_color, tolerance)
+
+
+    def _cached(self, recipe, source_paths, make):
+        """
+        Return the image recipe makes from the source files, reading it from
+         the cache if it's there and storing it if it isn't.
+        """
+        if self.cache is None:
+            return make()
+        cache_key = self.cache.key(recipe, source_paths)
+        image = self.cache.load(cache_key)
+        if image is None:
+            image = make()
+            self.cache.store(cache_key, image)
+        return image
+
+
+    def _name(self, key):
+        """Return a readable name for an asset key."""
+        if isinstance(key, str):
+            return key
+        path, _, desired_color, _ = key
+        return f"{path} recolored to {desired_color}"
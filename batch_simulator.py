@@ -0,0 +1,220 @@
+"""
+Play many headless games across every core, for tuning the difficulty.
+
+Play 300 games at each difficulty and summarize them:
+    python batch_simulator.py --games 300
+
+Try a different speed-up curve, saving every game's outcome:
+    python batch_simulator.py --set speedup_scale=1.3 --output games.jsonl
+"""
+
+import argparse
+import ast
+import json
+import os
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                wait)
+from time import perf_counter
+
+import pygame
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from game_state import GameState
+from controllers import CONTROLLERS
+from difficulty import DIFFICULTIES, LEVEL_FIELDS
+
+
+def play_game(spec):
+    """
+    Play one headless game described by spec, and return its outcome.
+    spec is a dictionary with the seed, difficulty, player (a name from
+     controllers.CONTROLLERS), frame limit and settings overrides of the game.
+    """
+    settings = Settings()
+    _apply_overrides(settings, spec['overrides'])
+    ai = AlienInvasion(headless=True, seed=spec['seed'], settings=settings,
+                       display=False)
+    # Overrides of level settings, like alien_speed, change where every
+    #  difficulty starts.
+    ai.difficulty_table.override_starts(spec['overrides'])
+    ai.select_difficulty(spec['difficulty'])
+
+    ai.controller = CONTROLLERS[spec['player']](spec['seed'])
+
+    frames = 0
+    start = perf_counter()
+    while frames < spec['frames'] and ai.state is not GameState.GAME_OVER:
+        ai._step_simulation()
+        frames += 1
+    elapsed = perf_counter() - start
+
+    pygame.quit()
+    return {
+        'id': spec['id'],
+        'seed': spec['seed'],
+        'difficulty': spec['difficulty'],
+        'player': spec['player'],
+        'level': ai.stats.level,
+        'score': ai.stats.score,
+        'frames': frames,
+        'game_over': ai.state is GameState.GAME_OVER,
+        'ms_per_frame': elapsed / max(frames, 1) * 1000,
+    }
+
+
+def run_batch(specs, workers=None, max_pending=None):
+    """
+    Play the games in specs across worker processes, and yield each outcome
+     as soon as it is ready, in no particular order.
+    Only max_pending games are handed to the workers at a time, so specs can
+     be a generator of any length.
+    """
+    workers = workers or os.cpu_count()
+    max_pending = max_pending or workers * 4
+    specs = iter(specs)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for spec in specs:
+            pending.add(executor.submit(play_game, spec))
+            if len(pending) >= max_pending:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                for spec in specs:
+                    pending.add(executor.submit(play_game, spec))
+                    break
+
+
+def make_specs(games, difficulties, frames, player, overrides, first_seed=0):
+    """Yield specs for the given number of games at each difficulty."""
+    game_id = 0
+    for difficulty in difficulties:
+        for number in range(games):
+            yield {
+                'id': game_id,
+                'seed': first_seed + number,
+                'difficulty': difficulty,
+                'player': player,
+                'frames': frames,
+                'overrides': overrides,
+            }
+            game_id += 1
+
+
+class BatchSummary:
+    """A class to add up game outcomes without keeping them."""
+
+    def __init__(self):
+        """Initialize empty totals for each difficulty."""
+        self.totals = {}
+
+
+    def add(self, outcome):
+        """Add one game's outcome to its difficulty's totals."""
+        totals = self.totals.setdefault(outcome['difficulty'], {
+            'games': 0, 'game_overs': 0, 'level': 0, 'max_level': 0,
+            'score': 0, 'frames': 0, 'ms_per_frame': 0.0,
+        })
+        totals['games'] += 1
+        totals['game_overs'] += outcome['game_over']
+        totals['level'] += outcome['level']
+        totals['max_level'] = max(totals['max_level'], outcome['level'])
+        totals['score'] += outcome['score']
+        totals['frames'] += outcome['frames']
+        totals['ms_per_frame'] += outcome['ms_per_frame']
+
+
+    def lines(self):
+        """Return a line of averages for each difficulty."""
+        lines = [f"{'difficulty':<12}{'games':>7}{'over':>7}{'level':>8}"
+                 f"{'max':>5}{'score':>10}{'frames':>10}{'ms/frame':>10}"]
+        for difficulty, totals in self.totals.items():
+            games = totals['games']
+            lines.append(
+                f"{difficulty:<12}{games:>7}{totals['game_overs']:>7}"
+                f"{totals['level'] / games:8.2f}{totals['max_level']:>5}"
+                f"{totals['score'] / games:10.0f}"
+                f"{totals['frames'] / games:10.0f}"
+                f"{totals['ms_per_frame'] / games:10.3f}")
+        return lines
+
+
+def _apply_overrides(settings, overrides):
+    """Set each name in overrides to its value on settings."""
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+def _parse_overrides(assignments):
+    """Turn ['speedup_scale=1.3'] into {'speedup_scale': 1.3}."""
+    overrides = {}
+    for assignment in assignments:
+        name, value = assignment.split('=', 1)
+        try:
+            overrides[name] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            overrides[name] = value
+    return overrides
+
+
+def _parse_args():
+    """Parse the command line options."""
+    parser = argparse.ArgumentParser(
+        description="Play many headless games of Alien Invasion.")
+    parser.add_argument('--games', type=int, default=100,
+                        help="games to play at each difficulty")
+    parser.add_argument('--difficulties', default=','.join(DIFFICULTIES),
+                        help="comma separated difficulty levels")
+    parser.add_argument('--frames', type=int, default=36000,
+                        help="most frames to play in each game")
+    parser.add_argument('--player', choices=sorted(CONTROLLERS),
+                        default='autopilot', help="controller to play with")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of the first game at each difficulty")
+    parser.add_argument('--set', action='append', default=[],
+                        metavar='NAME=VALUE', help="override a setting")
+    parser.add_argument('--workers', type=int,
+                        help="worker processes (default: one per core)")
+    parser.add_argument('--output',
+                        help="write each game's outcome to this JSON lines "
+                             "file as it finishes")
+    args = parser.parse_args()
+
+    # A misspelled setting would otherwise be set and never read, and the
+    #  batch would quietly play with the defaults.
+    names = set(vars(Settings())) | set(LEVEL_FIELDS)
+    for assignment in args.set:
+        name = assignment.split('=', 1)[0]
+        if '=' not in assignment or name not in names:
+            parser.error(f"argument --set: unknown setting {name!r}; expected "
+                         f"NAME=VALUE with a name from settings.py")
+    return args
+
+
+def main():
+    """Run a batch of games from the command line."""
+    args = _parse_args()
+    specs = make_specs(args.games, args.difficulties.split(','), args.frames,
+                       args.player, _parse_overrides(args.set), args.seed)
+
+    summary = BatchSummary()
+    output = open(args.output, 'w') if args.output else None
+    try:
+        for outcome in run_batch(specs, args.workers):
+            summary.add(outcome)
+            if output:
+                output.write(json.dumps(outcome) + '\n')
+    finally:
+        if output:
+            output.close()
+
+    print('\n'.join(summary.lines()))
+
+
+if __name__ == '__main__':
+    main()
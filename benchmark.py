@@ -0,0 +1,383 @@
+"""
+Time the hot paths of Alien Invasion in a headless game.
+
+Run the benchmarks and save the results:
+    python benchmark.py --output baseline.json
+
+Compare a later run against the saved results:
+    python benchmark.py --compare baseline.json
+
+Every run also times how long a game takes to start and draw its first frame.
+
+Recorded sessions can be replayed as part of the benchmarks:
+    python benchmark.py --replay session.bin --output baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+from time import perf_counter
+
+import pygame
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from input_log import InputReplay
+
+DEFAULT_RESOLUTIONS = '800x600,1280x720,1920x1080,3840x2160'
+DEFAULT_BULLET_COUNTS = '10,100,1000'
+
+
+class Benchmark:
+    """A class to time the hot paths of a headless game."""
+
+    def __init__(self, resolution, seed=0, difficulty='hard',
+                 fleet_backend='sprites', bullet_backend='sprites',
+                 dirty_rects=False):
+        """Create a headless game with the given screen resolution."""
+        settings = Settings()
+        settings.headless_screen_size = resolution
+        settings.fleet_backend = fleet_backend
+        settings.bullet_backend = bullet_backend
+        settings.dirty_rect_rendering = dirty_rects
+        self.resolution = resolution
+        self.seed = seed
+        self.config = _config_params(fleet_backend, bullet_backend,
+                                     dirty_rects)
+
+        self.ai = AlienInvasion(headless=True, seed=seed, settings=settings)
+        self.ai.select_difficulty(difficulty)
+
+
+    def run(self, bullet_counts, repeats):
+        """Run every benchmark and return a list of result dictionaries."""
+        results = []
+        results.append(self._time('create_fleet', {}, repeats,
+                                  self._empty_fleet, self.ai._create_fleet))
+        results.append(self._time('update_aliens', {}, repeats,
+                                  self._reset_fleet, self.ai._update_aliens))
+        results.append(self._time('update_screen', {}, repeats,
+                                  self._reset_fleet, self.ai._update_screen))
+
+        for bullets in bullet_counts:
+            params = {'bullets': bullets}
+            results.append(self._time(
+                'bullet_alien_collisions', params, repeats,
+                lambda: self._reset_with_ship_bullets(bullets, on_screen=True),
+                self.ai._check_bullet_alien_collisions))
+            results.append(self._time(
+                'update_ship_bullets', params, repeats,
+                lambda: self._reset_with_ship_bullets(bullets),
+                self.ai._update_ship_bullets))
+            results.append(self._time(
+                'update_alien_bullets', params, repeats,
+                lambda: self._reset_with_alien_bullets(bullets),
+                self.ai._update_alien_bullets))
+            results.append(self._time(
+                'update_screen', params, repeats,
+                lambda: self._reset_with_alien_bullets(bullets),
+                self.ai._update_screen))
+
+        return results
+
+
+    def _time(self, name, params, repeats, setup, function):
+        """Time repeated calls of function, running setup before each one."""
+        samples = []
+        fleet_size = 0
+        for _ in range(repeats):
+            setup()
+            aliens_before = len(self.ai.aliens)
+            start = perf_counter()
+            function()
+            samples.append(perf_counter() - start)
+            fleet_size = max(aliens_before, len(self.ai.aliens))
+
+        width, height = self.resolution
+        params = dict(params, resolution=f"{width}x{height}", **self.config)
+        return {
+            'benchmark': name,
+            'params': params,
+            'fleet_size': fleet_size,
+            'repeats': repeats,
+            'min_ms': min(samples) * 1000,
+            'median_ms': statistics.median(samples) * 1000,
+            'mean_ms': statistics.fmean(samples) * 1000,
+            'stdev_ms': (statistics.stdev(samples) * 1000
+                         if repeats > 1 else 0.0),
+        }
+
+
+    def _empty_fleet(self):
+        """Remove the fleet and reseed the game's random numbers."""
+        self.ai.aliens.empty()
+        self.ai.next_fleet = None
+        self.ai.random.seed(self.seed)
+
+
+    def _reset_fleet(self):
+        """Replace any bullets and aliens with a fresh fleet."""
+        self._empty_fleet()
+        self.ai.ship_bullets.empty()
+        self.ai.alien_bullets.empty()
+        self.ai.settings.fleet_direction = 1
+        self.ai._create_fleet()
+        self.ai.ship.center_ship()
+
+
+    def _reset_with_ship_bullets(self, count, on_screen=False):
+        """
+        Reset the fleet and fire count bullets from the ship, spread over the
+         screen. Unless on_screen is set, half of them are past the top edge.
+        """
+        self._reset_fleet()
+        rng = self.ai.random
+        width, height = self.resolution
+        bullet_height = self.ai.settings.ship_bullet_height
+        for number in range(count):
+            x = rng.randrange(width)
+            if on_screen or number % 2:
+                y = rng.randrange(height)
+            else:
+                y = -bullet_height - 1
+            self.ai.ship_bullets.add_bullet_at(x, y)
+
+
+    def _reset_with_alien_bullets(self, count):
+        """
+        Reset the fleet and fire count bullets from its aliens, half of them
+         already past the bottom edge.
+        """
+        self._reset_fleet()
+        rng = self.ai.random
+        width, height = self.resolution
+        for number in range(count):
+            x = rng.randrange(width)
+            if number % 2:
+                y = height + 1
+            else:
+                y = rng.randrange(height // 2)
+            self.ai.alien_bullets.add_bullet_at(x, y)
+
+
+def time_replay(file_path, repeats, fleet_backend='sprites',
+                bullet_backend='sprites', dirty_rects=False):
+    """
+    Replay a recorded session repeatedly, and return a result dictionary
+     giving the time per frame of each replay.
+    """
+    samples = []
+    for _ in range(repeats):
+        replay = InputReplay(file_path)
+        settings = Settings()
+        settings.fleet_backend = fleet_backend
+        settings.bullet_backend = bullet_backend
+        settings.dirty_rect_rendering = dirty_rects
+        replay.apply_to(settings)
+        ai = AlienInvasion(headless=True, seed=replay.seed, settings=settings)
+
+        start = perf_counter()
+        frames = ai.run_replay(replay)
+        samples.append((perf_counter() - start) / max(frames, 1))
+
+    width, height = replay.screen_size
+    return {
+        'benchmark': 'replay',
+        'params': {'recording': os.path.basename(file_path),
+                   'resolution': f"{width}x{height}",
+                   **_config_params(fleet_backend, bullet_backend,
+                                    dirty_rects)},
+        'fleet_size': ai.fleet_size,
+        'frames': frames,
+        'repeats': repeats,
+        'min_ms': min(samples) * 1000,
+        'median_ms': statistics.median(samples) * 1000,
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'stdev_ms': (statistics.stdev(samples) * 1000
+                     if repeats > 1 else 0.0),
+    }
+
+
+def time_startup(resolution, repeats, fleet_backend='sprites',
+                 bullet_backend='sprites', dirty_rects=False):
+    """
+    Start a headless game with the given screen resolution repeatedly, and
+     return a result dictionary giving the time from creating the game to
+     drawing its first frame. Imports are only timed once per process, so
+     they're left out.
+    """
+    samples = []
+    for _ in range(repeats):
+        settings = Settings()
+        settings.headless_screen_size = resolution
+        settings.fleet_backend = fleet_backend
+        settings.bullet_backend = bullet_backend
+        settings.dirty_rect_rendering = dirty_rects
+
+        start = perf_counter()
+        ai = AlienInvasion(headless=True, settings=settings)
+        ai._update_screen()
+        samples.append(perf_counter() - start)
+
+    width, height = resolution
+    return {
+        'benchmark': 'startup',
+        'params': {'resolution': f"{width}x{height}",
+                   **_config_params(fleet_backend, bullet_backend,
+                                    dirty_rects)},
+        'fleet_size': ai.fleet_size,
+        'repeats': repeats,
+        'min_ms': min(samples) * 1000,
+        'median_ms': statistics.median(samples) * 1000,
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'stdev_ms': (statistics.stdev(samples) * 1000
+                     if repeats > 1 else 0.0),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with baseline results.
+    Return the comparison lines and whether any benchmark regressed by more
+     than threshold (a fraction of the baseline median).
+    """
+    baseline_medians = {_key(result): result['median_ms']
+                        for result in baseline['results']}
+    lines = []
+    regressed = False
+    for result in results:
+        key = _key(result)
+        if key not in baseline_medians:
+            lines.append(f"{_label(result):<96} {'new':>10}")
+            continue
+
+        before = baseline_medians[key]
+        after = result['median_ms']
+        change = (after - before) / before if before else 0.0
+        flag = ''
+        if change > threshold:
+            flag = 'REGRESSION'
+            regressed = True
+        lines.append(f"{_label(result):<96} {before:9.3f} ms -> "
+                     f"{after:9.3f} ms {change:+7.1%} {flag}")
+
+    return lines, regressed
+
+
+def _key(result):
+    """
+    Return a hashable key identifying a benchmark and its parameters,
+     including the backends it ran with.
+    """
+    return (result['benchmark'], tuple(sorted(result['params'].items())))
+
+
+def _config_params(fleet_backend, bullet_backend, dirty_rects):
+    """Return the parameters recording which backends a benchmark used."""
+    return {'fleet_backend': fleet_backend,
+            'bullet_backend': bullet_backend,
+            'dirty_rects': dirty_rects}
+
+
+def _label(result):
+    """Return a readable label for a benchmark result."""
+    params = ' '.join(f"{name}={value}"
+                      for name, value in sorted(result['params'].items()))
+    return f"{result['benchmark']} {params}"
+
+
+def _parse_size_list(text):
+    """Turn '800x600,1920x1080' into [(800, 600), (1920, 1080)]."""
+    sizes = []
+    for size in text.split(','):
+        width, height = size.lower().split('x')
+        sizes.append((int(width), int(height)))
+    return sizes
+
+
+def _parse_args():
+    """Parse the command line options."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the hot paths of Alien Invasion.")
+    parser.add_argument('--resolutions', default=DEFAULT_RESOLUTIONS,
+                        help="comma separated screen sizes, e.g. 800x600")
+    parser.add_argument('--bullets', default=DEFAULT_BULLET_COUNTS,
+                        help="comma separated bullet counts")
+    parser.add_argument('--repeats', type=int, default=30,
+                        help="timed calls per benchmark")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed for the game's random numbers")
+    parser.add_argument('--fleet-backend', choices=('sprites', 'array'),
+                        default='sprites', help="how the fleet is stored")
+    parser.add_argument('--bullet-backend', choices=('sprites', 'pool'),
+                        default='sprites', help="how bullets are stored")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="redraw only the parts of the screen that change")
+    parser.add_argument('--replay', action='append', default=[],
+                        help="also time replays of this recorded session "
+                             "(may be given more than once)")
+    parser.add_argument('--replay-repeats', type=int, default=3,
+                        help="replays of each recorded session")
+    parser.add_argument('--startup-repeats', type=int, default=10,
+                        help="game startups to time")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare',
+                        help="compare against results in this JSON file")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="slowdown (as a fraction) counted as a regression")
+    return parser.parse_args()
+
+
+def main():
+    """Run the benchmarks from the command line."""
+    args = _parse_args()
+    bullet_counts = [int(count) for count in args.bullets.split(',')]
+
+    results = []
+    for resolution in _parse_size_list(args.resolutions):
+        results.append(time_startup(resolution, args.startup_repeats,
+                                    args.fleet_backend, args.bullet_backend,
+                                    args.dirty_rects))
+        benchmark = Benchmark(resolution, args.seed,
+                              fleet_backend=args.fleet_backend,
+                              bullet_backend=args.bullet_backend,
+                              dirty_rects=args.dirty_rects)
+        results.extend(benchmark.run(bullet_counts, args.repeats))
+
+    for file_path in args.replay:
+        results.append(time_replay(file_path, args.replay_repeats,
+                                   args.fleet_backend, args.bullet_backend,
+                                   args.dirty_rects))
+
+    report = {
+        'fleet_backend': args.fleet_backend,
+        'bullet_backend': args.bullet_backend,
+        'dirty_rects': args.dirty_rects,
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        lines, regressed = compare(results, baseline, args.threshold)
+        print('\n'.join(lines))
+        if regressed:
+            sys.exit(1)
+    else:
+        for result in results:
+            print(f"{_label(result):<96} {result['median_ms']:9.3f} ms "
+                  f"({result['fleet_size']} aliens)")
+
+
+if __name__ == '__main__':
+    main()
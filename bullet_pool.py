@@ -0,0 +1,229 @@
+import numpy as np
+import pygame
+
+from fleet import to_pixels
+
+class BulletPool:
+    """
+    A class to store bullets in preallocated arrays instead of sprites.
+    The bullets in play are packed, oldest first, at the front of the arrays.
+    """
+
+    def __init__(self, ai_game, width, height, color):
+        """Preallocate room for settings.bullet_pool_capacity bullets."""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.width = width
+        self.height = height
+        self.color = color
+
+        capacity = self.settings.bullet_pool_capacity
+        self.x = np.zeros(capacity, dtype=np.int64)
+        self.y = np.zeros(capacity)
+        self.count = 0
+
+        # Largest number of bullets in play at once, and how many times the
+        #  arrays had to grow to hold them.
+        self.high_water = 0
+        self.grows = 0
+
+        # A rect reused for every collision check.
+        self._rect = pygame.Rect(0, 0, width, height)
+
+        # Every bullet looks the same, so they're all drawn from one image.
+        self.image = pygame.Surface((width, height))
+        self.image.fill(color)
+
+
+    def __len__(self):
+        """Return the number of bullets in play."""
+        return self.count
+
+
+    def __bool__(self):
+        """Return True if any bullet is in play."""
+        return self.count > 0
+
+
+    def empty(self):
+        """Remove every bullet."""
+        self.count = 0
+
+
+    def stats(self):
+        """Return the pool's capacity, use and high-water mark."""
+        return {
+            'capacity': len(self.y),
+            'active': self.count,
+            'high_water': self.high_water,
+            'grows': self.grows,
+        }
+
+
+    def add_bullet_at(self, x, y):
+        """Add a bullet with its top left corner at (x, y)."""
+        if self.count == len(self.y):
+            self._grow()
+
+        self.x[self.count] = x
+        self.y[self.count] = y
+        self.count += 1
+        self.high_water = max(self.high_water, self.count)
+
+
+    def update(self):
+        """Move the bullets, and get rid of those that have disappeared."""
+        if not self.count:
+            return
+
+        self.y[:self.count] += self._step()
+        self._keep(self._on_screen(to_pixels(self.y[:self.count])))
+
+
+    def rects(self):
+        """Return a rect for every bullet in play."""
+        width, height = self.width, self.height
+        return [pygame.Rect(x, y, width, height)
+                for x, y in zip(self.x[:self.count].tolist(),
+                                to_pixels(self.y[:self.count]).tolist())]
+
+
+    def positions(self):
+        """Return an (n, 2) array of every bullet's top left corner."""
+        return np.column_stack((self.x[:self.count],
+                                to_pixels(self.y[:self.count])))
+
+
+    def draw_bullets(self, offset_y=0):
+        """Draw every bullet to the screen, shifted down by offset_y."""
+        if not self.count:
+            return
+
+        # Blit the image at every position in one call.
+        positions = zip(self.x[:self.count].tolist(),
+                        (to_pixels(self.y[:self.count]) + offset_y).tolist())
+        image = self.image
+        self.screen.blits([(image, position) for position in positions],
+                          False)
+
+
+    def _overlaps(self, rect):
+        """Return a mask of the bullets in play that overlap rect."""
+        x = self.x[:self.count]
+        y = to_pixels(self.y[:self.count])
+        return ((x < rect.right) & (x + self.width > rect.left)
+                & (y < rect.bottom) & (y + self.height > rect.top))
+
+
+    def _keep(self, mask):
+        """Keep only the bullets where mask is set, in the same order."""
+        kept = int(mask.sum())
+        if kept == self.count:
+            return
+
+        self.x[:kept] = self.x[:self.count][mask]
+        self.y[:kept] = self.y[:self.count][mask]
+        self.count = kept
+
+
+    def _grow(self):
+        """Double the size of the arrays."""
+        self.x = np.concatenate((self.x, np.zeros_like(self.x)))
+        self.y = np.concatenate((self.y, np.zeros_like(self.y)))
+        self.grows += 1
+
+
+class ShipBulletPool(BulletPool):
+    """A class to manage the bullets fired from the ship in a pool."""
+
+    def __init__(self, ai_game):
+        """Create an empty pool of ship bullets."""
+        settings = ai_game.settings
+        super().__init__(ai_game, settings.ship_bullet_width,
+                         settings.ship_bullet_height,
+                         settings.ship_bullet_color)
+
+
+    def fire(self):
+        """Fire a new bullet from the ship's current position."""
+        self._rect.midtop = self.ai_game.ship.rect.midtop
+        self.add_bullet_at(self._rect.x, self._rect.y)
+
+
+    def _step(self):
+        """Return how far down the bullets move each step."""
+        return -self.ai_game.level_settings.ship_bullet_step
+
+
+    def _on_screen(self, y):
+        """Return a mask of the bullets that have not left the top."""
+        return y + self.height > 0
+
+
+    def collide_fleet(self, fleet):
+        """
+        Remove bullets and aliens that collide.
+        Return {bullet index: [aliens it hit]}, like groupcollide does.
+        """
+        collisions = {}
+        if not self.count or not fleet:
+            return collisions
+
+        rect = self._rect
+        keep = np.ones(self.count, dtype=bool)
+        for index, (x, y) in enumerate(zip(
+                self.x[:self.count].tolist(),
+                to_pixels(self.y[:self.count]).tolist())):
+            rect.topleft = (x, y)
+            aliens = fleet.collide_rect(rect, True)
+            if aliens:
+                collisions[index] = aliens
+                keep[index] = False
+
+        self._keep(keep)
+        return collisions
+
+
+class AlienBulletPool(BulletPool):
+    """A class to manage the bullets fired from aliens in a pool."""
+
+    def __init__(self, ai_game):
+        """Create an empty pool of alien bullets."""
+        settings = ai_game.settings
+        super().__init__(ai_game, settings.alien_bullet_width,
+                         settings.alien_bullet_height,
+                         settings.alien_bullet_color)
+
+
+    def fire(self, alien):
+        """Fire a new bullet from the alien's current position."""
+        self._rect.midtop = alien.rect.midbottom
+        self.add_bullet_at(self._rect.x, self._rect.y)
+
+
+    def _step(self):
+        """Return how far down the bullets move each step."""
+        return self.ai_game.level_settings.alien_bullet_step
+
+
+    def _on_screen(self, y):
+        """Return a mask of the bullets that have not left the bottom."""
+        return y < self.settings.screen_height
+
+
+    def collide_rect(self, rect, dokill):
+        """Return how many bullets collide with rect."""
+        if not self.count:
+            return 0
+
+        overlaps = self._overlaps(rect)
+        hits = int(overlaps.sum())
+        if dokill and hits:
+            self._keep(~overlaps)
+        return hits
+
+
+    def collide_any(self, rect):
+        """Return True if any bullet collides with rect."""
+        return bool(self.count and self._overlaps(rect).any())
@@ -1,4 +1,4 @@
-import pygame.font
+import pygame
 
 class Button:
     """A class to build buttons for the game."""
@@ -6,13 +6,15 @@ class Button:
     def __init__(self, ai_game, msg, position_multiplier=0):
         """Initialize button attributes."""
         self.screen = ai_game.screen
-        self.screen_rect = self.screen.get_rect()
+        self.screen_rect = pygame.Rect(0, 0, ai_game.settings.screen_width,
+                                       ai_game.settings.screen_height)
+        self.text_cache = ai_game.text_cache
 
         # Set the dimensions and properties of the button.
         self.width, self.height = 200, 50
         self.button_color = (0, 135, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = None
 
         # Build the button's rect object and center it.
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -22,19 +24,25 @@ class Button:
         if isinstance(position_multiplier, (int, float)):
             self.rect.y += position_multiplier * self.height
 
-        # The button message needs to be prepped only once.
-        self._prep_msg(msg)
+        # The button message is prepped the first time the button is drawn,
+        #  so a game that draws nothing never loads the font.
+        self.msg = msg
+        self.msg_image = None
     
 
     def _prep_msg(self, msg):
         """Turn msg into a rendered image and center text on the button."""
-        self.msg_image = self.font.render(msg, True,
-                                          self.text_color, self.button_color)
+        self.font = self.text_cache.font(None, 48)
+        self.msg_image = self.text_cache.render(self.font, msg,
+                                                self.text_color,
+                                                self.button_color)
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
 
     
     def draw_button(self):
         """Draw blank button and then draw message."""
+        if self.msg_image is None:
+            self._prep_msg(self.msg)
         self.screen.fill(self.button_color, self.rect)
         self.screen.blit(self.msg_image, self.msg_image_rect)
\ No newline at end of file
@@ -0,0 +1,169 @@
+from random import Random
+
+import input_log
+from game_state import GameState
+
+class Controller:
+    """
+    A base class for players that control the ship from code.
+    The game calls control() once before every step it plays, and the
+     controller acts through steer(), fire() and deploy_shield(). When the
+     game records its inputs, those actions are recorded too, so the session
+     replays without the controller.
+    """
+
+    def control(self, ai_game):
+        """Decide what to do this step."""
+        raise NotImplementedError
+
+
+    def steer(self, ai_game, direction):
+        """Move the ship left (-1), right (1), or stop it (0)."""
+        ship = ai_game.ship
+        moving = (direction < 0, direction > 0)
+        if (ship.moving_left, ship.moving_right) == moving:
+            return
+        ship.moving_left, ship.moving_right = moving
+        self._record(ai_game, input_log.STEER, moving[1] - moving[0])
+
+
+    def fire(self, ai_game):
+        """Fire a bullet if another one is allowed."""
+        if ai_game.state is GameState.PLAYING:
+            bullets = len(ai_game.ship_bullets)
+            ai_game._fire_ship_bullet()
+            if len(ai_game.ship_bullets) > bullets:
+                self._record(ai_game, input_log.FIRE)
+
+
+    def deploy_shield(self, ai_game):
+        """Deploy the shield if it is available."""
+        if (ai_game.state is GameState.PLAYING
+                and ai_game.shield.shield_available):
+            ai_game.shield.deploy_shield()
+            self._record(ai_game, input_log.SHIELD)
+
+
+    def _record(self, ai_game, action, direction=0):
+        """Record an action if the game is recording its inputs."""
+        if ai_game.recorder:
+            # Controllers act during a step, after the game has counted it;
+            #  recorded inputs are tied to the step they came before.
+            ai_game.recorder.record_action(ai_game.steps - 1, action,
+                                           direction)
+
+
+class IdleController(Controller):
+    """A controller that never touches the controls."""
+
+    def __init__(self, seed=None):
+        """Idle controllers need no state."""
+
+
+    def control(self, ai_game):
+        """Do nothing this step."""
+
+
+class RandomController(Controller):
+    """A controller that changes what it does at random."""
+
+    def __init__(self, seed=None, change_probability=0.05):
+        """Initialize the controller's own random numbers."""
+        self.random = Random(seed)
+        self.change_probability = change_probability
+
+
+    def control(self, ai_game):
+        """Now and then steer, fire, or deploy the shield at random."""
+        if self.random.random() >= self.change_probability:
+            return
+
+        action = self.random.randrange(4)
+        if action == 0:
+            self.steer(ai_game, self.random.choice((-1, 0, 1)))
+        elif action == 1:
+            self.fire(ai_game)
+        elif action == 2:
+            self.deploy_shield(ai_game)
+
+
+class AutopilotController(Controller):
+    """
+    A heuristic player that keeps firing, lines up under the aliens, dodges
+     alien bullets, and deploys the shield when it can't get out of the way.
+    """
+
+    def __init__(self, seed=None, dodge_height=250, shield_height=60):
+        """
+        Initialize the autopilot.
+        Alien bullets are dodged once they are within dodge_height pixels of
+         the ship, and the shield goes up for bullets within shield_height.
+        """
+        self.dodge_height = dodge_height
+        self.shield_height = shield_height
+
+
+    def control(self, ai_game):
+        """Dodge if a bullet is coming, otherwise line up and fire."""
+        ship_rect = ai_game.ship.rect
+        threat = self._threat(ai_game, ship_rect)
+
+        if threat is not None:
+            # Move towards whichever side of the bullet has more room.
+            room_left = threat.left
+            room_right = ai_game.settings.screen_width - threat.right
+            self.steer(ai_game, -1 if room_left > room_right else 1)
+            if ship_rect.top - threat.bottom < self.shield_height:
+                self.deploy_shield(ai_game)
+        else:
+            self.steer(ai_game, self._direction_to_target(ai_game, ship_rect))
+
+        # Aliens low enough to reach the ship call for the shield too.
+        fleet_rect = ai_game.aliens.bounding_rect()
+        if fleet_rect and ship_rect.top - fleet_rect.bottom < self.shield_height:
+            self.deploy_shield(ai_game)
+
+        self.fire(ai_game)
+
+
+    def _threat(self, ai_game, ship_rect):
+        """Return the rect of the nearest alien bullet about to hit the ship."""
+        danger = ship_rect.inflate(ship_rect.width // 2, 0)
+        nearest = None
+        for rect in ai_game.alien_bullets.rects():
+            if (rect.right < danger.left or rect.left > danger.right
+                    or rect.bottom > ship_rect.bottom
+                    or ship_rect.top - rect.bottom > self.dodge_height):
+                continue
+            if nearest is None or rect.bottom > nearest.bottom:
+                nearest = rect
+        return nearest
+
+
+    def _direction_to_target(self, ai_game, ship_rect):
+        """Return the direction that lines the ship up under an alien."""
+        aliens = ai_game.aliens.sprites()
+        if not aliens:
+            return 0
+
+        # Aim for the lowest alien nearest the ship, leading it by how far
+        #  the fleet moves while a bullet climbs up to it.
+        settings = ai_game.settings
+        target = max(aliens, key=lambda alien: (
+            alien.rect.bottom, -abs(alien.rect.centerx - ship_rect.centerx)))
+        climb_steps = ((ship_rect.top - target.rect.bottom)
+                       / settings.ship_bullet_speed)
+        lead = (settings.alien_speed * settings.fleet_direction
+                * climb_steps)
+        offset = target.rect.centerx + lead - ship_rect.centerx
+
+        if abs(offset) <= settings.ship_speed * settings.motion_scale:
+            return 0
+        return 1 if offset > 0 else -1
+
+
+CONTROLLERS = {
+    'idle': IdleController,
+    'random': RandomController,
+    'autopilot': AutopilotController,
+}
@@ -0,0 +1,207 @@
+from pathlib import Path
+import json
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# Values that change from level to level. The speeds and the shooter
+#  probability grow by speedup_scale each level, and the points by
+#  score_scale.
+SPEED_FIELDS = ('ship_speed', 'ship_bullet_speed', 'alien_speed',
+                'alien_shooter_probability')
+LEVEL_FIELDS = SPEED_FIELDS + ('alien_points',)
+
+
+class LevelSettings:
+    """
+    A read-only snapshot of the settings for one level of one difficulty.
+    Besides the speeds, it holds how far the ship, bullets and aliens move
+     each simulation step, so the update loops don't have to work it out.
+    """
+
+    __slots__ = (('difficulty', 'level') + LEVEL_FIELDS
+                 + ('ship_step', 'ship_bullet_step', 'alien_step',
+                    'alien_bullet_step'))
+
+    def __init__(self, difficulty, level, values, motion_scale,
+                 alien_bullet_speed):
+        """Fill in the snapshot; it can't be changed afterwards."""
+        fill = object.__setattr__
+        fill(self, 'difficulty', difficulty)
+        fill(self, 'level', level)
+        for name in LEVEL_FIELDS:
+            fill(self, name, values[name])
+
+        fill(self, 'ship_step', values['ship_speed'] * motion_scale)
+        fill(self, 'ship_bullet_step',
+             values['ship_bullet_speed'] * motion_scale)
+        fill(self, 'alien_step', values['alien_speed'] * motion_scale)
+        fill(self, 'alien_bullet_step', alien_bullet_speed * motion_scale)
+
+
+    def __setattr__(self, name, value):
+        """Refuse to change a snapshot."""
+        raise AttributeError(f"level settings are read-only ({name})")
+
+
+    def as_dict(self):
+        """Return the snapshot as a dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}"
+                           for name in self.__slots__)
+        return f"LevelSettings({fields})"
+
+
+class DifficultyTable:
+    """
+    A class to work out the settings of every level at each difficulty.
+    Where each difficulty starts is read from a JSON file of the form
+     {"easy": {"ship_speed": 2.0, ...}, ...}, which may also give a
+     difficulty its own "speedup_scale" and "score_scale". The first
+     settings.difficulty_levels levels are worked out up front, and later
+     levels when they're first reached.
+    """
+
+    def __init__(self, settings):
+        """Load the starting values and work out the first levels."""
+        self.motion_scale = settings.motion_scale
+        self.alien_bullet_speed = settings.alien_bullet_speed
+        self.starts = {}
+        self.scales = {difficulty: (settings.speedup_scale,
+                                    settings.score_scale)
+                       for difficulty in DIFFICULTIES}
+        self._read_starts(settings.difficulty_file)
+
+        self.initial_levels = settings.difficulty_levels
+        self._build()
+
+
+    def level(self, difficulty, number):
+        """Return the LevelSettings of a level at a difficulty."""
+        levels = self.levels[difficulty or 'medium']
+        while len(levels) < number:
+            levels.append(self._next_level(levels[-1]))
+        return levels[number - 1]
+
+
+    def override_starts(self, overrides):
+        """
+        Change where every difficulty starts for any names in overrides that
+         are level settings, and work out the levels again.
+        """
+        values = {name: value for name, value in overrides.items()
+                  if name in LEVEL_FIELDS}
+        if not values:
+            return
+        for difficulty in DIFFICULTIES:
+            self.starts[difficulty].update(values)
+            self._validate(difficulty, self.starts[difficulty], 'overrides')
+        self._build()
+
+
+    def lines(self, difficulty, levels=10):
+        """Return a line of settings for each of the first levels."""
+        widths = [len(name) + 2 for name in LEVEL_FIELDS]
+        lines = [f"{'level':>5}" + ''.join(
+            f"{name:>{width}}" for name, width in zip(LEVEL_FIELDS, widths))]
+        for number in range(1, levels + 1):
+            level = self.level(difficulty, number)
+            lines.append(f"{number:>5}" + ''.join(
+                f"{getattr(level, name):>{width}.6g}"
+                for name, width in zip(LEVEL_FIELDS, widths)))
+        return lines
+
+
+    def _build(self):
+        """Work out the first levels at every difficulty."""
+        self.levels = {}
+        for difficulty in DIFFICULTIES:
+            levels = [self._snapshot(difficulty, 1, self.starts[difficulty])]
+            self.levels[difficulty] = levels
+            self.level(difficulty, self.initial_levels)
+
+
+    def _next_level(self, level):
+        """Return the level after the given one."""
+        speedup_scale, score_scale = self.scales[level.difficulty]
+        # Compound the values one level at a time, so they come out exactly
+        #  as they would if they were sped up during the game.
+        values = {name: getattr(level, name) * speedup_scale
+                  for name in SPEED_FIELDS}
+        values['alien_points'] = int(level.alien_points * score_scale)
+        return self._snapshot(level.difficulty, level.level + 1, values)
+
+
+    def _snapshot(self, difficulty, number, values):
+        """Return the LevelSettings for the given values."""
+        return LevelSettings(difficulty, number, values, self.motion_scale,
+                             self.alien_bullet_speed)
+
+
+    def _read_starts(self, file_path):
+        """Read where each difficulty starts from a file."""
+        self.path = Path(file_path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"{self.path}: the difficulty file is "
+                                    f"missing; it sets where each difficulty "
+                                    f"starts")
+
+        contents = json.loads(self.path.read_text())
+        if not isinstance(contents, dict):
+            raise ValueError(f"{self.path}: expected an object of "
+                             f"difficulties")
+        for difficulty, values in contents.items():
+            if difficulty not in DIFFICULTIES:
+                raise ValueError(f"{self.path}: unknown difficulty "
+                                 f"{difficulty!r}")
+            if not isinstance(values, dict):
+                raise ValueError(f"{self.path}: {difficulty} should be an "
+                                 f"object of settings")
+
+            values = dict(values)
+            speedup_scale, score_scale = self.scales[difficulty]
+            speedup_scale = values.pop('speedup_scale', speedup_scale)
+            score_scale = values.pop('score_scale', score_scale)
+            for name, scale in (('speedup_scale', speedup_scale),
+                                ('score_scale', score_scale)):
+                if not _is_number(scale) or scale <= 0:
+                    raise ValueError(f"{self.path}: {difficulty} {name} "
+                                     f"must be a positive number")
+            self.scales[difficulty] = (speedup_scale, score_scale)
+
+            missing = set(LEVEL_FIELDS) - set(values)
+            if missing:
+                raise ValueError(f"{self.path}: {difficulty} is missing "
+                                 f"{', '.join(sorted(missing))}")
+            self._validate(difficulty, values, self.path)
+            self.starts[difficulty] = values
+
+        missing = [difficulty for difficulty in DIFFICULTIES
+                   if difficulty not in self.starts]
+        if missing:
+            raise ValueError(f"{self.path}: missing difficulties "
+                             f"{', '.join(missing)}")
+
+
+    def _validate(self, difficulty, values, source):
+        """Raise ValueError if a difficulty's starting values don't make sense."""
+        for name, value in values.items():
+            if name not in LEVEL_FIELDS:
+                raise ValueError(f"{source}: unknown setting {name!r} for "
+                                 f"{difficulty}")
+            if not _is_number(value) or value <= 0:
+                raise ValueError(f"{source}: {difficulty} {name} must be a "
+                                 f"positive number")
+        if values['alien_shooter_probability'] > 1:
+            raise ValueError(f"{source}: {difficulty} alien_shooter_probability "
+                             f"must be at most 1")
+        if not isinstance(values['alien_points'], int):
+            raise ValueError(f"{source}: {difficulty} alien_points must be a "
+                             f"whole number")
+
+
+def _is_number(value):
+    """Return True if value is an int or float, but not a bool."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,114 @@
+import pygame
+
+from game_state import GameState
+
+class DirtyRenderer:
+    """
+    A class to redraw only the parts of the screen that changed.
+    Everything drawn in the previous frame is erased, the scene is drawn
+     again, and only the erased and newly drawn rects are sent to the display.
+    """
+
+    def __init__(self, ai_game, renderer):
+        """Initialize the renderer; the first frame is drawn in full."""
+        self.ai_game = ai_game
+        self.renderer = renderer
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        self.previous_rects = []
+        self.previous_menu = None
+        self.full_redraw = True
+
+
+    def request_full_redraw(self):
+        """Redraw and send the whole screen on the next frame."""
+        self.full_redraw = True
+
+
+    def render(self):
+        """Draw the scene, sending only the changed rects to the display."""
+        ai_game = self.ai_game
+
+        # A menu that looks the same as last frame needs no drawing at all.
+        menu = self._menu_state()
+        if (not self.full_redraw and menu is not None
+                and menu == self.previous_menu):
+            return
+        self.previous_menu = menu
+
+        if self.full_redraw:
+            self.screen.fill(self.settings.bg_color)
+            self.renderer.draw_scene()
+            pygame.display.flip()
+            self.previous_rects = self._scene_rects()
+            self.full_redraw = False
+            return
+
+        bg_color = self.settings.bg_color
+        for rect in self.previous_rects:
+            self.screen.fill(bg_color, rect)
+
+        self.renderer.draw_scene()
+
+        rects = self._scene_rects()
+        pygame.display.update(self.previous_rects + rects)
+        self.previous_rects = rects
+
+
+    def _menu_state(self):
+        """
+        Return a summary of everything a menu screen shows, or None while
+         the game is being played or the overlay is updating.
+        """
+        ai_game = self.ai_game
+        if ai_game.game_active or ai_game.frame_timer.overlay_visible:
+            return None
+
+        stats = ai_game.stats
+        return (ai_game.state, stats.score, stats.high_score,
+                stats.level, stats.ships_left, len(ai_game.aliens),
+                ai_game.shield.shield_available)
+
+
+    def _scene_rects(self):
+        """Return the rects of everything Renderer.draw_scene draws."""
+        ai_game = self.ai_game
+        sb = self.renderer.sb
+        shield = ai_game.shield
+
+        ship_dx, fleet_dx, ship_bullet_dy, alien_bullet_dy = (
+            self.renderer.offsets())
+
+        rects = [ai_game.ship.rect.move(ship_dx, 0)]
+        rects += [rect.move(0, ship_bullet_dy)
+                  for rect in ai_game.ship_bullets.rects()]
+        rects += [rect.move(0, alien_bullet_dy)
+                  for rect in ai_game.alien_bullets.rects()]
+
+        fleet_rect = ai_game.aliens.bounding_rect()
+        if fleet_rect:
+            rects.append(fleet_rect.move(fleet_dx, 0))
+
+        if shield.shield_active and shield.in_play():
+            rects.append(shield.rect.copy())
+        if shield.shield_available:
+            rects.append(sb.availability_rect.copy())
+
+        rects += [sb.score_rect.copy(), sb.high_score_rect.copy(),
+                  sb.level_rect.copy()]
+        if sb.ships:
+            ship_rects = [ship.rect for ship in sb.ships.sprites()]
+            rects.append(ship_rects[0].unionall(ship_rects[1:]))
+
+        if not ai_game.game_active:
+            buttons = [ai_game.play_button]
+            if ai_game.state is GameState.DIFFICULTY_SELECT:
+                buttons += [ai_game.easy_button, ai_game.medium_button,
+                            ai_game.hard_button]
+            rects += [button.rect.copy() for button in buttons]
+
+        if ai_game.frame_timer.overlay_visible:
+            rects.append(ai_game.frame_timer.overlay_rect.copy())
+
+        return rects
@@ -0,0 +1,281 @@
+import numpy as np
+import pygame
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from controllers import Controller
+from game_state import GameState
+
+# The actions an agent can choose from each step, as (direction to steer,
+#  fire, deploy the shield).
+ACTIONS = (
+    (0, False, False),
+    (-1, False, False),
+    (1, False, False),
+    (0, True, False),
+    (-1, True, False),
+    (1, True, False),
+    (0, False, True),
+)
+ACTION_NAMES = ('stop', 'left', 'right', 'fire', 'left and fire',
+                'right and fire', 'shield')
+
+# Values at the start of a state vector, before the aliens and bullets.
+STATE_FIELDS = ('ship_x', 'shield_health', 'shield_active', 'shield_available',
+                'score', 'ships_left', 'level', 'fleet_direction')
+
+
+class ActionController(Controller):
+    """A controller that carries out the action an agent chose."""
+
+    def __init__(self):
+        """Start with the ship standing still."""
+        self.action = 0
+
+
+    def control(self, ai_game):
+        """Carry out the current action."""
+        direction, fire, shield = ACTIONS[self.action]
+        self.steer(ai_game, direction)
+        if fire:
+            self.fire(ai_game)
+        if shield:
+            self.deploy_shield(ai_game)
+
+
+class AlienInvasionEnv:
+    """
+    A class to play a headless game one step at a time, with the reset() and
+     step() methods reinforcement learning libraries expect.
+    Observations are either a state vector ('state') or the screen scaled
+     down to pixel_size ('pixels'), as a height x width x 3 array.
+    In a state vector, positions are fractions of the screen size, and the
+     fields in STATE_FIELDS are followed by (x, y, present) for every alien,
+     ship bullet and alien bullet, padded to a fixed length.
+    """
+
+    def __init__(self, observation='state', difficulty='medium',
+                 screen_size=(1200, 800), pixel_size=(84, 84), frame_skip=1,
+                 max_steps=None, max_alien_bullets=32, settings=None):
+        """
+        Create the game.
+        Each step repeats the chosen action for frame_skip simulation steps,
+         and an episode is cut short after max_steps steps if given.
+        """
+        if settings is None:
+            settings = Settings()
+            settings.fleet_backend = 'array'
+            settings.bullet_backend = 'pool'
+        settings.headless_screen_size = screen_size
+
+        # Only pixel observations need anything drawn.
+        self.ai = AlienInvasion(headless=True, settings=settings,
+                                display=(observation == 'pixels'))
+        self.controller = ActionController()
+        self.ai.controller = self.controller
+        self.settings = settings
+
+        self.observation = observation
+        self.difficulty = difficulty
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.steps = 0
+        self.action_count = len(ACTIONS)
+
+        # A full fleet is the most aliens there can be at once.
+        self.max_aliens = len(self.ai.aliens)
+        self.max_ship_bullets = settings.ship_bullets_allowed
+        self.max_alien_bullets = max_alien_bullets
+        self._scale = np.array(screen_size, dtype=np.float32)
+
+        if observation == 'pixels':
+            # The screen is scaled into this surface, and observations are a
+            #  view of its pixels, so no copy is made.
+            screen = self.ai.screen
+            self.pixel_surface = pygame.Surface(pixel_size, 0, screen)
+            self.pixels = pygame.surfarray.pixels3d(
+                self.pixel_surface).transpose(1, 0, 2)
+            self.observation_shape = self.pixels.shape
+            self.observation_dtype = np.uint8
+        elif observation == 'state':
+            self.observation_shape = (len(STATE_FIELDS) + 3 * (
+                self.max_aliens + self.max_ship_bullets
+                + self.max_alien_bullets),)
+            self.observation_dtype = np.float32
+        else:
+            raise ValueError(f"unknown observation type {observation!r}")
+
+
+    def reset(self, seed=None):
+        """Start a new game and return (observation, info)."""
+        ai = self.ai
+        if seed is not None:
+            ai.random.seed(seed)
+
+        ai._set_state(GameState.MENU)
+        ai.shield.reset_shield()
+        ai.select_difficulty(self.difficulty)
+        self.controller.action = 0
+        self.steps = 0
+        return self.observe(), self._info()
+
+
+    def step(self, action, out=None):
+        """
+        Play one step with the given action, and return (observation,
+         reward, terminated, truncated, info). The reward is the points
+         scored during the step, and the observation is written into out
+         if given.
+        """
+        ai = self.ai
+        self.controller.action = action
+        score = ai.stats.score
+
+        for _ in range(self.frame_skip):
+            ai._step_simulation()
+            if ai.state is GameState.GAME_OVER:
+                break
+        self.steps += 1
+
+        terminated = ai.state is GameState.GAME_OVER
+        truncated = (self.max_steps is not None
+                     and self.steps >= self.max_steps)
+        return (self.observe(out), float(ai.stats.score - score),
+                terminated, truncated, self._info())
+
+
+    def observe(self, out=None):
+        """
+        Return the current observation, written into out if given.
+        A pixel observation without out is a view of the scaled screen, which
+         the next step overwrites.
+        """
+        if self.observation == 'pixels':
+            self._draw()
+            if out is None:
+                return self.pixels
+            out[...] = self.pixels
+            return out
+
+        if out is None:
+            out = np.empty(self.observation_shape, dtype=np.float32)
+        self._state(out)
+        return out
+
+
+    def _draw(self):
+        """Draw the scene and scale it down to the pixel surface."""
+        ai = self.ai
+        ai.screen.fill(self.settings.bg_color)
+        ai.renderer.draw_scene()
+        pygame.transform.scale(ai.screen, self.pixel_surface.get_size(),
+                               self.pixel_surface)
+
+
+    def _state(self, out):
+        """Write the state vector into out."""
+        ai = self.ai
+        settings = self.settings
+        shield = ai.shield
+
+        out[:len(STATE_FIELDS)] = (
+            ai.ship.rect.centerx / self._scale[0],
+            shield.health / settings.shield_health,
+            shield.shield_active,
+            shield.shield_available,
+            ai.stats.score,
+            ai.stats.ships_left,
+            ai.stats.level,
+            settings.fleet_direction,
+        )
+
+        start = len(STATE_FIELDS)
+        for positions, count in (
+                (ai.aliens.positions(), self.max_aliens),
+                (ai.ship_bullets.positions(), self.max_ship_bullets),
+                (self._nearest_alien_bullets(), self.max_alien_bullets)):
+            block = out[start:start + 3 * count].reshape(count, 3)
+            block[:] = 0
+            positions = np.asarray(positions, dtype=np.float32)[:count]
+            if len(positions):
+                block[:len(positions), :2] = positions / self._scale
+                block[:len(positions), 2] = 1
+            start += 3 * count
+
+
+    def _nearest_alien_bullets(self):
+        """Return the alien bullets closest to the bottom of the screen first."""
+        positions = np.asarray(self.ai.alien_bullets.positions()).reshape(-1, 2)
+        if len(positions) <= self.max_alien_bullets:
+            return positions
+        return positions[np.argsort(-positions[:, 1], kind='stable')]
+
+
+    def _info(self):
+        """Return extra information about the game."""
+        stats = self.ai.stats
+        return {'score': stats.score, 'level': stats.level,
+                'ships_left': stats.ships_left}
+
+
+class VectorAlienInvasionEnv:
+    """
+    A class to step several games at once.
+    Observations, rewards and flags come back as arrays with one row per
+     game. A game that ends is reset straight away, and the last
+     observation of the finished game is put in its info.
+    All the games share the one display surface, so they must use the same
+     screen size.
+    """
+
+    def __init__(self, num_envs, **kwargs):
+        """Create num_envs games, passing kwargs on to AlienInvasionEnv."""
+        self.envs = [AlienInvasionEnv(**kwargs) for _ in range(num_envs)]
+        self.num_envs = num_envs
+        env = self.envs[0]
+        self.action_count = env.action_count
+        self.observation_shape = env.observation_shape
+
+        # These arrays are reused, and overwritten by each call.
+        self.observations = np.zeros((num_envs,) + env.observation_shape,
+                                     dtype=env.observation_dtype)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+
+
+    def reset(self, seed=None):
+        """
+        Reset every game and return (observations, infos).
+        Game number i is seeded with seed + i if a seed is given.
+        """
+        infos = []
+        for index, env in enumerate(self.envs):
+            env.reset(None if seed is None else seed + index)
+            env.observe(self.observations[index])
+            infos.append(env._info())
+        return self.observations, infos
+
+
+    def step(self, actions):
+        """
+        Play one step in every game, and return (observations, rewards,
+         terminated, truncated, infos).
+        """
+        infos = []
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            observation = self.observations[index]
+            _, reward, terminated, truncated, info = env.step(
+                int(action), observation)
+            if terminated or truncated:
+                info['final_observation'] = observation.copy()
+                env.reset()
+                env.observe(observation)
+
+            self.rewards[index] = reward
+            self.terminated[index] = terminated
+            self.truncated[index] = truncated
+            infos.append(info)
+        return (self.observations, self.rewards, self.terminated,
+                self.truncated, infos)
+
@@ -0,0 +1,482 @@
+import numpy as np
+import pygame
+from pygame.sprite import Group
+
+from alien import Alien
+from shot_scheduler import ShotScheduler, to_steps
+from spatial_hash import SpatialHash
+
+class SpriteFleet(Group):
+    """A class to manage the fleet as a group of Alien sprites."""
+
+    def __init__(self, ai_game):
+        """Initialize an empty fleet."""
+        # The hash and the scheduler must exist before Group.__init__ can add
+        #  any sprites.
+        self.grid = SpatialHash(ai_game.settings.collision_cell_size)
+        self.scheduler = ShotScheduler()
+        self.shooters = {}
+        self.next_shooter = 0
+        super().__init__()
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+
+
+    def add_internal(self, sprite, layer=None):
+        """
+        Add a sprite to the group and file it in the spatial hash. Shooters
+         are also scheduled to fire.
+        """
+        super().add_internal(sprite, layer)
+        self.grid.insert(sprite, sprite.rect)
+        if sprite.can_shoot:
+            # Shooters are numbered as they're added, and shooters due at the
+            #  same step fire in that order.
+            sprite.shooter_key = self.next_shooter
+            self.next_shooter += 1
+            self.shooters[sprite.shooter_key] = sprite
+            schedule_shooter(self.scheduler, sprite.shooter_key,
+                             sprite.shoot_cooldown, sprite.cooldown_period,
+                             self.settings)
+
+
+    def remove_internal(self, sprite):
+        """
+        Remove a sprite from the group and from the spatial hash, and stop it
+         shooting.
+        """
+        super().remove_internal(sprite)
+        self.grid.remove(sprite)
+        if sprite.can_shoot:
+            del self.shooters[sprite.shooter_key]
+            self.scheduler.cancel(sprite.shooter_key)
+
+
+    def empty(self):
+        """Remove every alien and reset the spatial hash and scheduler."""
+        super().empty()
+        self.grid.clear()
+        self.scheduler.clear()
+        self.next_shooter = 0
+
+
+    def update(self):
+        """Move every alien right or left."""
+        # Work out the distance once for the whole fleet.
+        dx = (self.ai_game.level_settings.alien_step
+              * self.settings.fleet_direction)
+        super().update(dx)
+        self.grid.move(dx, 0)
+
+
+    def draw(self, surface, offset_x=0):
+        """Draw every alien, shifted right by offset_x."""
+        if not offset_x:
+            return super().draw(surface)
+        surface.blits([(alien.image, alien.rect.move(offset_x, 0))
+                       for alien in self.sprites()], False)
+
+
+    def spawn(self, positions, cooldowns=None):
+        """
+        Add an alien at each (x, y) position. If cooldowns are given, each
+         alien shoots with its own cooldown instead of settings.cooldown_period.
+        """
+        new_aliens = []
+        for index, (x_position, y_position) in enumerate(
+                np.asarray(positions).tolist()):
+            new_alien = Alien(self.ai_game)
+            new_alien.x = x_position
+            new_alien.rect.topleft = (x_position, y_position)
+            if cooldowns is not None:
+                new_alien.cooldown_period = float(cooldowns[index])
+                new_alien.shoot_cooldown = (new_alien.cooldown_draw
+                                            * new_alien.cooldown_period)
+            new_aliens.append(new_alien)
+        self.add(new_aliens)
+
+
+    def at_edge(self):
+        """Return True if any alien is at an edge of the screen."""
+        for alien in self.sprites():
+            if alien.check_edges():
+                return True
+        return False
+
+
+    def drop(self, distance):
+        """Move every alien down the screen."""
+        for alien in self.sprites():
+            alien.rect.y += distance
+        self.grid.move(0, distance)
+
+
+    def fire(self):
+        """Move the scheduler on a step, and let the shooters it picks shoot."""
+        for key in self.scheduler.advance():
+            self.shooters[key].shoot()
+
+
+    def reached_bottom(self, screen_height):
+        """Return True if any alien has reached the bottom of the screen."""
+        for alien in self.sprites():
+            if alien.rect.bottom >= screen_height:
+                return True
+        return False
+
+
+    def positions(self):
+        """Return the (x, y) top left corner of every alien."""
+        return [alien.rect.topleft for alien in self.sprites()]
+
+
+    def bounding_rect(self):
+        """Return the smallest rect around every alien, or None."""
+        rects = [alien.rect for alien in self.sprites()]
+        if not rects:
+            return None
+        return rects[0].unionall(rects[1:])
+
+
+    def collide_group(self, group, dokill_group, dokill_fleet):
+        """
+        Return {sprite: [aliens it hit]} for the sprites in group that hit
+         an alien, like pygame.sprite.groupcollide(group, fleet, ...).
+        """
+        collisions = {}
+        if not self:
+            return collisions
+
+        for sprite in group.sprites():
+            aliens = self.collide_sprite(sprite, dokill_fleet)
+            if aliens:
+                collisions[sprite] = aliens
+                if dokill_group:
+                    sprite.kill()
+        return collisions
+
+
+    def collide_sprite(self, sprite, dokill):
+        """Return the aliens that collide with sprite."""
+        return self.collide_rect(sprite.rect, dokill)
+
+
+    def collide_rect(self, rect, dokill):
+        """Return the aliens that collide with rect."""
+        aliens = [alien for alien in self.grid.query(rect)
+                  if rect.colliderect(alien.rect)]
+        if dokill:
+            for alien in aliens:
+                alien.kill()
+        return aliens
+
+
+    def collide_any(self, sprite):
+        """Return True if any alien collides with sprite."""
+        rect = sprite.rect
+        return any(rect.colliderect(alien.rect)
+                   for alien in self.grid.query(rect))
+
+
+class FleetAlien:
+    """A lightweight stand-in for one alien of an ArrayFleet."""
+
+    __slots__ = ('index', 'rect', 'can_shoot')
+
+    def __init__(self, index, rect, can_shoot):
+        """Store the alien's index in the fleet's arrays and its rect."""
+        self.index = index
+        self.rect = rect
+        self.can_shoot = can_shoot
+
+
+class ArrayFleet:
+    """
+    A class to manage the fleet as contiguous NumPy arrays.
+    Movement, edge and bottom checks and drops each take one array operation,
+     however many aliens there are, and only shooters are scheduled to fire.
+    Collisions are found through the spatial hash and tested in plain
+     Python, one bullet at a time, like SpriteFleet does.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize an empty fleet."""
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+
+        self.image = ai_game.assets.image('images/alien.bmp')
+        self.shooter_image = ai_game.assets.recolored_image(
+            'images/alien.bmp', self.settings.alien_color,
+            self.settings.alien_shooter_color, self.settings.color_tolerance)
+        self.width, self.height = self.image.get_size()
+
+        self.grid = SpatialHash(self.settings.collision_cell_size)
+        self.scheduler = ShotScheduler()
+        self.empty()
+
+
+    def empty(self):
+        """Remove every alien."""
+        self.x = np.zeros(0)
+        self.y = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.can_shoot = np.zeros(0, dtype=bool)
+        # Each shooter's key in the scheduler, or -1 for other aliens, and the
+        #  index of each shooter by key.
+        self.shooter_keys = np.zeros(0, dtype=np.int64)
+        self.shooters = {}
+        self.next_shooter = 0
+        self.count = 0
+        self._pixels = None
+        self.grid.clear()
+        self.scheduler.clear()
+
+
+    def __len__(self):
+        """Return the number of aliens still alive."""
+        return self.count
+
+
+    def __bool__(self):
+        """Return True if any alien is still alive."""
+        return self.count > 0
+
+
+    def spawn(self, positions, cooldowns=None):
+        """
+        Replace any dead aliens and add an alien at each (x, y) position. If
+         cooldowns are given, each alien shoots with its own cooldown instead
+         of settings.cooldown_period.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        number = len(positions)
+
+        # Draw the random numbers in the same order Alien does, so a seed
+        #  produces the same fleet with either backend.
+        random = self.ai_game.random.random
+        probability = self.ai_game.level_settings.alien_shooter_probability
+        period = self.settings.cooldown_period
+        draws = np.array([(random(), random()) for _ in range(number)])
+        draws = draws.reshape(-1, 2)
+        can_shoot = draws[:, 0] < probability
+
+        # Number the new shooters in order, like SpriteFleet does, and
+        #  schedule them.
+        keys = np.full(number, -1, dtype=np.int64)
+        for index in np.flatnonzero(can_shoot).tolist():
+            keys[index] = self.next_shooter
+            shooter_period = (period if cooldowns is None
+                              else float(cooldowns[index]))
+            schedule_shooter(self.scheduler, self.next_shooter,
+                             draws[index, 1] * shooter_period, shooter_period,
+                             self.settings)
+            self.next_shooter += 1
+
+        keep = self.alive
+        renumbered = not keep.all()
+        self.x = np.concatenate((self.x[keep], positions[:, 0]))
+        self.y = np.concatenate((self.y[keep],
+                                 positions[:, 1].astype(np.int64)))
+        self.can_shoot = np.concatenate((self.can_shoot[keep], can_shoot))
+        self.shooter_keys = np.concatenate((self.shooter_keys[keep], keys))
+        self.alive = np.ones(len(self.x), dtype=bool)
+        self.count = len(self.x)
+        self._pixels = None
+
+        # If dead aliens were dropped, the rest were renumbered, so look up
+        #  and file every alien again. Otherwise only the new aliens need
+        #  it, which keeps spawning a fleet in chunks cheap.
+        first = 0 if renumbered else self.count - number
+        if renumbered:
+            self.shooters = {}
+            self.grid.clear()
+        for index in np.flatnonzero(self.shooter_keys[first:] >= 0).tolist():
+            index += first
+            self.shooters[int(self.shooter_keys[index])] = index
+
+        rect_x, rect_y = self._pixel_lists()
+        rect = pygame.Rect(0, 0, self.width, self.height)
+        for index in range(first, self.count):
+            rect.topleft = (rect_x[index], rect_y[index])
+            self.grid.insert(index, rect)
+
+
+    def _rect_x(self):
+        """Return every alien's rect.x, rounded like pygame does."""
+        return to_pixels(self.x)
+
+
+    def _pixel_lists(self):
+        """
+        Return every alien's rect.x and rect.y as lists of ints. They're
+         worked out once after the fleet moves, so the many small collision
+         tests each step can use plain Python instead of tiny NumPy arrays.
+        """
+        if self._pixels is None:
+            self._pixels = self._rect_x().tolist(), self.y.tolist()
+        return self._pixels
+
+
+    def at_edge(self):
+        """Return True if any alien is at an edge of the screen."""
+        rect_x = self._rect_x()[self.alive]
+        return bool(((rect_x + self.width >= self.settings.screen_width)
+                     | (rect_x <= 0)).any())
+
+
+    def update(self):
+        """Move every alien right or left."""
+        dx = (self.ai_game.level_settings.alien_step
+              * self.settings.fleet_direction)
+        self.x += dx
+        self._pixels = None
+        self.grid.move(dx, 0)
+
+
+    def drop(self, distance):
+        """Move every alien down the screen."""
+        self.y += distance
+        self._pixels = None
+        self.grid.move(0, distance)
+
+
+    def fire(self):
+        """Move the scheduler on a step, and let the shooters it picks shoot."""
+        for key in self.scheduler.advance():
+            self.ai_game.alien_bullets.fire(self._alien(self.shooters[key]))
+
+
+    def reached_bottom(self, screen_height):
+        """Return True if any alien has reached the bottom of the screen."""
+        return bool((self.y[self.alive] + self.height >= screen_height).any())
+
+
+    def collide_group(self, group, dokill_group, dokill_fleet):
+        """
+        Return {sprite: [aliens it hit]} for the sprites in group that hit
+         an alien, like pygame.sprite.groupcollide(group, fleet, ...).
+        """
+        collisions = {}
+        if not self.count:
+            return collisions
+
+        for sprite in group.sprites():
+            hits = self._hits(sprite.rect)
+            if not hits:
+                continue
+
+            collisions[sprite] = [self._alien(index) for index in hits]
+            if dokill_group:
+                sprite.kill()
+            if dokill_fleet:
+                self._kill(hits)
+        return collisions
+
+
+    def collide_sprite(self, sprite, dokill):
+        """Return the aliens that collide with sprite."""
+        return self.collide_rect(sprite.rect, dokill)
+
+
+    def collide_rect(self, rect, dokill):
+        """Return the aliens that collide with rect."""
+        hits = self._hits(rect)
+        aliens = [self._alien(index) for index in hits]
+        if dokill:
+            self._kill(hits)
+        return aliens
+
+
+    def collide_any(self, sprite):
+        """Return True if any alien collides with sprite."""
+        return bool(self._hits(sprite.rect))
+
+
+    def sprites(self):
+        """Return a stand-in for every alien still alive."""
+        return [self._alien(index) for index in np.flatnonzero(self.alive)]
+
+
+    def positions(self):
+        """Return an (n, 2) array of every live alien's top left corner."""
+        alive = self.alive
+        return np.column_stack((self._rect_x()[alive], self.y[alive]))
+
+
+    def bounding_rect(self):
+        """Return the smallest rect around every alien, or None."""
+        if not self.count:
+            return None
+
+        rect_x = self._rect_x()[self.alive]
+        y = self.y[self.alive]
+        left, top = int(rect_x.min()), int(y.min())
+        return pygame.Rect(left, top,
+                           int(rect_x.max()) + self.width - left,
+                           int(y.max()) + self.height - top)
+
+
+    def draw(self, surface, offset_x=0):
+        """Draw every alien still alive, shifted right by offset_x."""
+        alive = self.alive
+        images = [self.shooter_image if can_shoot else self.image
+                  for can_shoot in self.can_shoot[alive].tolist()]
+        positions = zip((self._rect_x()[alive] + offset_x).tolist(),
+                        self.y[alive].tolist())
+        surface.blits(list(zip(images, positions)), False)
+
+
+    def _hits(self, rect):
+        """Return the indices of the aliens still alive that overlap rect."""
+        candidates = self.grid.query(rect)
+        if not candidates:
+            return candidates
+
+        # A rect only has a handful of candidates, which plain Python tests
+        #  faster than NumPy can set up arrays for them.
+        rect_x, rect_y = self._pixel_lists()
+        left = rect.left - self.width
+        top = rect.top - self.height
+        right, bottom = rect.right, rect.bottom
+        return [index for index in candidates
+                if left < rect_x[index] < right
+                and top < rect_y[index] < bottom]
+
+
+    def _kill(self, indices):
+        """Remove the aliens at the given indices."""
+        for index in indices:
+            self.alive[index] = False
+            self.grid.remove(index)
+            key = int(self.shooter_keys[index])
+            if key >= 0:
+                del self.shooters[key]
+                self.scheduler.cancel(key)
+        self.count -= len(indices)
+
+
+    def _alien(self, index):
+        """Return a stand-in for the alien at index."""
+        rect_x, rect_y = self._pixel_lists()
+        rect = pygame.Rect(rect_x[index], rect_y[index], self.width,
+                           self.height)
+        return FleetAlien(int(index), rect, bool(self.can_shoot[index]))
+
+
+def schedule_shooter(scheduler, key, cooldown, period, settings):
+    """
+    Schedule a shooter to fire its first volley once cooldown seconds have
+     passed, and then every period seconds.
+    """
+    rate = settings.simulation_rate
+    scheduler.add(key, to_steps(cooldown, rate), to_steps(period, rate),
+                  settings.alien_volley_size,
+                  to_steps(settings.alien_volley_spacing, rate))
+
+
+def to_pixels(x):
+    """
+    Round float positions to whole pixels the way a pygame Rect does, with
+     halves rounded away from zero.
+    """
+    return np.trunc(x + np.copysign(0.5, x)).astype(np.int64)
@@ -0,0 +1,150 @@
+from pathlib import Path
+import json
+
+import numpy as np
+
+# The formation every fleet used before formations could be chosen: an alien
+#  in every cell of the grid.
+GRID = ('A',)
+
+class FleetLayouts:
+    """
+    A class to work out where each alien of a new fleet goes.
+    The screen is divided into a grid of cells two aliens wide and two aliens
+     high. A formation is a pattern of rows, where 'A' marks a cell with an
+     alien in it, repeated across the grid. A formation can also give each
+     column of its pattern its own cooldown, the seconds between the
+     volleys of the shooters in that column. Each layout is worked out once
+     for a given formation, screen size and alien size.
+    """
+
+    def __init__(self, file_path='formations.json'):
+        """Load the formations from a file, if it exists."""
+        self.formations = {'grid': GRID}
+        self.column_cooldowns = {'grid': None}
+        self._read_formations(file_path)
+        self.layouts = {}
+
+
+    def _read_formations(self, file_path):
+        """
+        Add every formation in a JSON file of {name: [rows]}, or
+         {name: {"rows": [rows], "cooldowns": [seconds per column]}}.
+        """
+        self.path = Path(file_path)
+        if not self.path.exists():
+            return
+
+        contents = json.loads(self.path.read_text())
+        if not isinstance(contents, dict):
+            raise ValueError(f"{self.path}: expected an object of formations")
+        for name, formation in contents.items():
+            rows, cooldowns = formation, None
+            if isinstance(formation, dict):
+                rows = formation.get('rows')
+                cooldowns = formation.get('cooldowns')
+                unknown = set(formation) - {'rows', 'cooldowns'}
+                if unknown:
+                    raise ValueError(f"{self.path}: formation {name!r} has "
+                                     f"unknown fields {sorted(unknown)}")
+            self._validate(name, rows)
+            if cooldowns is not None:
+                self._validate_cooldowns(name, rows, cooldowns)
+                cooldowns = tuple(cooldowns)
+            self.formations[name] = tuple(rows)
+            self.column_cooldowns[name] = cooldowns
+
+
+    def _validate(self, name, rows):
+        """Raise ValueError if a formation's rows don't make a pattern."""
+        if (not isinstance(rows, list) or not rows
+                or not all(isinstance(row, str) and row for row in rows)):
+            raise ValueError(f"{self.path}: formation {name!r} should be a "
+                             f"list of rows of text")
+        if len({len(row) for row in rows}) > 1:
+            raise ValueError(f"{self.path}: the rows of formation {name!r} "
+                             f"should all be the same length")
+        if set(''.join(rows)) - {'A', '.'}:
+            raise ValueError(f"{self.path}: formation {name!r} should only "
+                             f"use 'A' for an alien and '.' for a gap")
+        if 'A' not in ''.join(rows):
+            raise ValueError(f"{self.path}: formation {name!r} has no aliens")
+
+
+    def _validate_cooldowns(self, name, rows, cooldowns):
+        """Raise ValueError unless there's a positive cooldown per column."""
+        if not isinstance(cooldowns, list) or len(cooldowns) != len(rows[0]):
+            raise ValueError(f"{self.path}: formation {name!r} should have "
+                             f"one cooldown per column")
+        for cooldown in cooldowns:
+            if (not isinstance(cooldown, (int, float))
+                    or isinstance(cooldown, bool) or cooldown <= 0):
+                raise ValueError(f"{self.path}: the cooldowns of formation "
+                                 f"{name!r} must be positive numbers")
+
+
+    def positions(self, formation, screen_size, alien_size):
+        """
+        Return a read-only (n, 2) array of the (x, y) position of every alien,
+         row by row from the top left.
+        """
+        return self._cached_layout(formation, screen_size, alien_size)[0]
+
+
+    def cooldowns(self, formation, screen_size, alien_size):
+        """
+        Return a read-only array of the cooldown of every alien, in the same
+         order as positions(), or None if the formation doesn't set them.
+        """
+        return self._cached_layout(formation, screen_size, alien_size)[1]
+
+
+    def _cached_layout(self, formation, screen_size, alien_size):
+        """
+        Return the positions and cooldowns of a layout, working them out the
+         first time they're needed.
+        """
+        if formation not in self.formations:
+            raise ValueError(f"unknown formation {formation!r}; choose from "
+                             f"{', '.join(self.formations)}")
+
+        key = (formation, tuple(screen_size), tuple(alien_size))
+        layout = self.layouts.get(key)
+        if layout is None:
+            positions, columns = self._layout(self.formations[formation],
+                                              screen_size, alien_size)
+            positions.setflags(write=False)
+            cooldowns = self.column_cooldowns[formation]
+            if cooldowns is not None:
+                cooldowns = np.array(cooldowns, dtype=np.float64)[columns]
+                cooldowns.setflags(write=False)
+            layout = self.layouts[key] = (positions, cooldowns)
+        return layout
+
+
+    def _layout(self, rows, screen_size, alien_size):
+        """
+        Return the positions of the aliens of a pattern of rows, and the
+         column of the pattern each alien is in.
+        """
+        screen_width, screen_height = screen_size
+        alien_width, alien_height = alien_size
+
+        # Spacing between aliens is one alien width, and the bottom of the
+        #  screen is left clear for the ship.
+        xs = np.arange(alien_width, screen_width - 2 * alien_width,
+                       2 * alien_width)
+        ys = np.arange(alien_height, screen_height - 3 * alien_height,
+                       2 * alien_height)
+
+        pattern = np.array([[cell == 'A' for cell in row] for row in rows],
+                           dtype=bool)
+        pattern_rows, pattern_columns = pattern.shape
+        filled = pattern[np.arange(len(ys))[:, None] % pattern_rows,
+                         np.arange(len(xs))[None, :] % pattern_columns]
+
+        y_grid, x_grid = np.meshgrid(ys, xs, indexing='ij')
+        columns = np.broadcast_to(np.arange(len(xs)) % pattern_columns,
+                                  filled.shape)
+        return (np.column_stack((x_grid[filled], y_grid[filled])),
+                columns[filled])
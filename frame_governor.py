@@ -0,0 +1,114 @@
+from collections import deque
+
+# The ways the game can save time when frames run over budget, from the
+#  least noticeable to the most:
+#  'hud' renders the score, level and ships less often,
+#  'sounds' plays only the sound effects in settings.critical_sounds,
+#  'render' draws only every governor_render_every'th frame, and
+#  'collisions' checks ship bullets against the fleet only every
+#  governor_collision_interval steps, for as long as bullets are too slow
+#  to pass through an alien in that time.
+TIERS = ('hud', 'sounds', 'render', 'collisions')
+
+
+class FrameGovernor:
+    """
+    A class to keep the game within its frame budget on slow machines.
+    It watches how long each frame takes, and when the slowest frames of the
+     last governor_window go over budget it gives up one more tier of
+     quality. Quality comes back a tier at a time, once frames have stayed
+     well under budget for governor_restore_frames, so the game doesn't
+     flicker between tiers.
+    """
+
+    def __init__(self, ai_game):
+        """Start at full quality."""
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+
+        frame_rate = self.settings.frame_rate or 60
+        self.budget = self.settings.frame_budget or 1 / frame_rate
+
+        for tier in self.settings.governor_tiers:
+            if tier not in TIERS:
+                raise ValueError(f"unknown frame governor tier {tier!r}")
+        # Skipping collision checks changes how the game plays out, which a
+        #  recording of the inputs couldn't reproduce.
+        self.tiers = [tier for tier in self.settings.governor_tiers
+                      if not (tier == 'collisions'
+                              and self.settings.input_record_path)]
+
+        # How many of the tiers are given up.
+        self.level = 0
+        self.recent = deque(maxlen=self.settings.governor_window)
+        self.frames = 0
+        self.calm_frames = 0
+        # (frame, tier given up or restored, level before, level after,
+        #  slowest recent frame, average recent frame) for every change.
+        self.changes = []
+
+        # Draw every frame until the 'render' tier is given up.
+        self.render_every = 1
+
+
+    def record_frame(self, seconds):
+        """Note how long a frame took, and change tier if needed."""
+        self.frames += 1
+        self.recent.append(seconds)
+        if seconds < self.budget * self.settings.governor_restore_fraction:
+            self.calm_frames += 1
+        else:
+            self.calm_frames = 0
+
+        # Wait for a full window of frames at the current tier.
+        if len(self.recent) < self.recent.maxlen:
+            return
+
+        worst = sorted(self.recent)[int(0.95 * (len(self.recent) - 1))]
+        if worst > self.budget and self.level < len(self.tiers):
+            self._set_level(self.level + 1, worst)
+        elif (self.calm_frames >= self.settings.governor_restore_frames
+                and self.level > 0):
+            self._set_level(self.level - 1, worst)
+
+
+    def degraded(self, tier):
+        """Return True if tier has been given up."""
+        return tier in self.tiers[:self.level]
+
+
+    def _set_level(self, level, worst):
+        """Give up or restore tiers until level of them are given up."""
+        average = sum(self.recent) / len(self.recent)
+        tier = self.tiers[max(level, self.level) - 1]
+        self.changes.append((self.frames, tier, self.level, level, worst,
+                             average))
+        change = 'giving up' if level > self.level else 'restoring'
+        print(f"Frame governor: {change} {tier} (tier {self.level} -> "
+              f"{level}); 95th percentile {worst * 1000:.1f} ms, average "
+              f"{average * 1000:.1f} ms, budget {self.budget * 1000:.1f} ms")
+
+        self.level = level
+        self._apply(tier, self.degraded(tier))
+
+        # Judge the new tier on its own frames.
+        self.recent.clear()
+        self.calm_frames = 0
+
+
+    def _apply(self, tier, degraded):
+        """Turn the savings of a tier on or off."""
+        ai_game = self.ai_game
+        settings = self.settings
+        if tier == 'hud':
+            if ai_game.renderer:
+                ai_game.renderer.sb.refresh_interval = (
+                    settings.governor_hud_refresh if degraded else 1)
+        elif tier == 'sounds':
+            ai_game.sound_effects.critical_only = degraded
+        elif tier == 'render':
+            self.render_every = (settings.governor_render_every if degraded
+                                 else 1)
+        elif tier == 'collisions':
+            ai_game.collision_interval = (
+                settings.governor_collision_interval if degraded else 1)
@@ -0,0 +1,170 @@
+import csv
+from array import array
+from time import perf_counter
+
+import pygame
+
+# The phases of a frame, in the order run_game goes through them.
+PHASES = ('events', 'ship', 'ship_bullets', 'aliens', 'alien_bullets',
+          'screen')
+
+# Column of each phase in a frame's row; the last column holds the frame's
+#  total time.
+EVENTS, SHIP, SHIP_BULLETS, ALIENS, ALIEN_BULLETS, SCREEN = range(len(PHASES))
+TOTAL = len(PHASES)
+
+
+class FrameTimer:
+    """A class to record how long each phase of the recent frames took."""
+
+    def __init__(self, ai_game, capacity=600):
+        """Preallocate room for the timings of the last capacity frames."""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        self.capacity = capacity
+        self.columns = len(PHASES) + 1
+        self.timings = array('d', bytes(8 * capacity * self.columns))
+        self.frames = 0
+
+        # Offset of the current frame's row, and the times the frame and its
+        #  latest phase started.
+        self._row = 0
+        self._frame_start = 0.0
+        self._phase_start = 0.0
+
+        # The overlay is hidden until toggled, and its text is only rendered
+        #  again every refresh_interval frames.
+        self.overlay_visible = False
+        self.refresh_interval = 30
+        self.text_color = (30, 30, 30)
+        # The font is loaded the first time the overlay is shown.
+        self.font = None
+        self.overlay_images = []
+
+        # Seconds taken by each level transition, from the last alien dying
+        #  to the next fleet being in place.
+        self.level_transitions = array('d')
+
+
+    def start_frame(self):
+        """Start timing a new frame."""
+        self._row = (self.frames % self.capacity) * self.columns
+        for column in range(self._row, self._row + self.columns):
+            self.timings[column] = 0.0
+        self._frame_start = self._phase_start = perf_counter()
+
+
+    def mark(self, phase):
+        """
+        Add the time since the previous mark to phase. A phase marked more
+         than once in a frame, like the steps of a slow frame, adds up.
+        """
+        now = perf_counter()
+        self.timings[self._row + phase] += now - self._phase_start
+        self._phase_start = now
+
+
+    def end_frame(self):
+        """Record the frame's total time."""
+        self.timings[self._row + TOTAL] = perf_counter() - self._frame_start
+        self.frames += 1
+
+
+    def latest(self, phase=TOTAL):
+        """Return the seconds phase took in the last finished frame."""
+        row = ((self.frames - 1) % self.capacity) * self.columns
+        return self.timings[row + phase]
+
+
+    def record_level_transition(self, seconds):
+        """Record how long a level transition took."""
+        self.level_transitions.append(seconds)
+
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """
+        Return {phase: [milliseconds at each percent]} over the recorded
+         frames, including a 'total' entry for whole frames.
+        """
+        count = min(self.frames, self.capacity)
+        results = {}
+        for column, name in enumerate(PHASES + ('total',)):
+            samples = sorted(self.timings[column:count * self.columns:
+                                          self.columns])
+            if not samples:
+                results[name] = [0.0 for _ in percents]
+                continue
+            results[name] = [samples[round(percent / 100 * (count - 1))] * 1000
+                             for percent in percents]
+        return results
+
+
+    def toggle_overlay(self):
+        """Show the overlay if it is hidden, and hide it if it is shown."""
+        self.overlay_visible = not self.overlay_visible
+        self.overlay_images = []
+
+
+    def draw_overlay(self):
+        """Draw the frame time percentiles and sprite counts."""
+        if not self.overlay_images or self.frames % self.refresh_interval == 0:
+            self._prep_overlay()
+
+        bottom = y = self.screen.get_rect().bottom - 10
+        width = 0
+        for image in reversed(self.overlay_images):
+            y -= image.get_height()
+            width = max(width, image.get_width())
+            self.screen.blit(image, (10, y))
+
+        # Remember where the overlay went, for the dirty-rect renderer.
+        self.overlay_rect = pygame.Rect(10, y, width, bottom - y)
+
+
+    def _prep_overlay(self):
+        """Turn the current statistics into rendered lines of text."""
+        if self.font is None:
+            self.font = self.ai_game.text_cache.font('monospace', 20)
+        lines = [f"{'phase':<14}{'p50':>8}{'p95':>8}{'p99':>8}  ms"]
+        for name, values in self.percentiles().items():
+            lines.append(f"{name:<14}" + ''.join(f"{value:8.2f}"
+                                                 for value in values))
+        lines.append(f"aliens {len(self.ai_game.aliens)}  "
+                     f"ship bullets {len(self.ai_game.ship_bullets)}  "
+                     f"alien bullets {len(self.ai_game.alien_bullets)}")
+        if self.settings.bullet_backend == 'pool':
+            for name, pool in (('ship', self.ai_game.ship_bullets),
+                               ('alien', self.ai_game.alien_bullets)):
+                stats = pool.stats()
+                lines.append(f"{name} pool {stats['active']}/"
+                             f"{stats['capacity']}  "
+                             f"high water {stats['high_water']}")
+        governor = self.ai_game.governor
+        if governor and governor.level:
+            lines.append("reduced quality: "
+                         + ', '.join(governor.tiers[:governor.level]))
+        if self.level_transitions:
+            lines.append(f"last level-up "
+                         f"{self.level_transitions[-1] * 1000:.2f} ms")
+
+        self.overlay_images = [self.font.render(line, True, self.text_color,
+                                                self.settings.bg_color)
+                               for line in lines]
+
+
+    def write_csv(self, file_path):
+        """Write the recorded frames, oldest first, to a CSV file."""
+        count = min(self.frames, self.capacity)
+        first_frame = self.frames - count
+
+        with open(file_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('frame',) + tuple(f"{name}_ms" for name in
+                                               PHASES + ('total',)))
+            for frame in range(first_frame, self.frames):
+                row = (frame % self.capacity) * self.columns
+                writer.writerow([frame] + [
+                    f"{seconds * 1000:.4f}"
+                    for seconds in self.timings[row:row + self.columns]])
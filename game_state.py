@@ -0,0 +1,15 @@
+from enum import Enum
+
+class GameState(Enum):
+    """The states Alien Invasion moves between."""
+
+    # The Play button is showing, before the first game.
+    MENU = 'menu'
+    # The difficulty buttons are showing.
+    DIFFICULTY_SELECT = 'difficulty select'
+    # The game is running.
+    PLAYING = 'playing'
+    # The ship was hit; the game waits before the next ship comes in.
+    RESPAWN_PAUSE = 'respawn pause'
+    # The last ship was lost; the Play button is showing again.
+    GAME_OVER = 'game over'
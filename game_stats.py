@@ -1,6 +1,8 @@
 from pathlib import Path
 import json
 
+from score_history import ScoreHistory
+
 class GameStats:
     """Track statistics for Alien Invasion."""
 
@@ -9,6 +11,14 @@ class GameStats:
         self.settings = ai_game.settings
         self.reset_stats()
 
+        # Log every finished game, unless the game is headless.
+        if self.settings.score_history_dir and not ai_game.headless:
+            self.history = ScoreHistory(self.settings.score_history_dir,
+                                        self.settings.leaderboard_size,
+                                        self.settings.score_history_max_games)
+        else:
+            self.history = None
+
         # High score should never be reset.
         self._read_high_score()
 
@@ -26,6 +36,11 @@ class GameStats:
         else:
             self.high_score = 0
 
+        # The history knows about games that ended without the file being
+        #  written.
+        if self.history:
+            self.high_score = max(self.high_score, self.history.high_score())
+
 
     def reset_stats(self):
         """Initialize statistics that can change during the game."""
@@ -34,6 +49,25 @@ class GameStats:
         self.level = 1
 
 
+    def check_high_score(self):
+        """Check to see if there's a new high score."""
+        if self.score > self.high_score:
+            self.high_score = self.score
+
+
+    def record_game(self, frames, seed=None):
+        """Log the game that just ended in the score history."""
+        if self.history:
+            self.history.record(self.score, self.level,
+                                self.settings.difficulty_level, frames, seed)
+
+
+    def close_history(self):
+        """Finish writing the score history."""
+        if self.history:
+            self.history.close()
+
+
     def write_high_score(self, file_path='high_score.json'):
         """Write the high score to a file."""
         self.path = Path(file_path)
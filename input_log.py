@@ -0,0 +1,172 @@
+import struct
+
+import pygame
+
+from difficulty import DIFFICULTIES as GAME_DIFFICULTIES
+
+# A recording starts with a header: a magic number, the format version, the
+#  seed, the screen size, the simulation rate and the length of the fleet
+#  formation's name, followed by the name itself.
+MAGIC = b'AIIN'
+VERSION = 2
+# Versions this one can still read; version 1 had no controller actions.
+READABLE_VERSIONS = (1, 2)
+HEADER = struct.Struct('<4sHqHHHB')
+
+# Each input is one record: the simulation step it came before, its kind,
+#  the key (or difficulty), and the mouse position.
+RECORD = struct.Struct('<IBihh')
+
+# The kinds of record. DIFFICULTY is a difficulty chosen by a script rather
+#  than with the mouse, and END marks the step the session stopped at.
+KEYDOWN, KEYUP, MOUSEBUTTONDOWN, DIFFICULTY, END = range(1, 6)
+# A difficulty is recorded by its number here; 0 means none was chosen.
+DIFFICULTIES = ('',) + GAME_DIFFICULTIES
+
+# Actions taken by a Controller from controllers.py rather than the keyboard:
+#  steering (with the direction as the key), firing a bullet, and deploying
+#  the shield. Only actions that changed something are recorded.
+STEER, FIRE, SHIELD = range(6, 9)
+ACTIONS = (STEER, FIRE, SHIELD)
+
+EVENT_KINDS = {
+    pygame.KEYDOWN: KEYDOWN,
+    pygame.KEYUP: KEYUP,
+    pygame.MOUSEBUTTONDOWN: MOUSEBUTTONDOWN,
+}
+
+# Records read from the file at a time while replaying.
+CHUNK_RECORDS = 4096
+
+# The events DIFFICULTY records and controller actions are replayed as.
+DIFFICULTY_SELECTED = pygame.event.custom_type()
+CONTROLLER_ACTION = pygame.event.custom_type()
+
+
+class InputRecorder:
+    """
+    A class to write a game's inputs to a compact binary file as they happen.
+    Together with the seed and screen size, the inputs are enough to play
+     the session out again exactly.
+    """
+
+    def __init__(self, file_path, seed, settings):
+        """Open the file and write the header."""
+        formation = settings.fleet_formation.encode('utf-8')
+        width, height = settings.screen_width, settings.screen_height
+
+        self.file = open(file_path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, width, height,
+                                    settings.simulation_rate, len(formation)))
+        self.file.write(formation)
+        self.records = 0
+
+
+    def record(self, step, event):
+        """Record an event the game is about to handle before step."""
+        kind = EVENT_KINDS.get(event.type)
+        if kind is None:
+            return
+
+        key = getattr(event, 'key', 0)
+        x, y = getattr(event, 'pos', (0, 0))
+        self.file.write(RECORD.pack(step, kind, key, x, y))
+        self.records += 1
+
+
+    def record_difficulty(self, step, difficulty_level):
+        """Record a difficulty level chosen before step."""
+        self.file.write(RECORD.pack(step, DIFFICULTY,
+                                    DIFFICULTIES.index(difficulty_level), 0, 0))
+        self.records += 1
+
+
+    def record_action(self, step, action, direction=0):
+        """Record a controller's action, taken during step."""
+        self.file.write(RECORD.pack(step, action, direction, 0, 0))
+        self.records += 1
+
+
+    def close(self, step):
+        """Mark where the session stopped and close the file."""
+        if self.file.closed:
+            return
+        self.file.write(RECORD.pack(step, END, 0, 0, 0))
+        self.file.close()
+
+
+class InputReplay:
+    """
+    A class to read back a recording made by InputRecorder.
+    Records are read from the file a chunk at a time, so long sessions are
+     never held in memory.
+    """
+
+    def __init__(self, file_path):
+        """Open the file and read the header."""
+        self.file = open(file_path, 'rb')
+        (magic, version, self.seed, width, height, self.simulation_rate,
+         formation_length) = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or version not in READABLE_VERSIONS:
+            self.file.close()
+            raise ValueError(f"{file_path} is not an Alien Invasion "
+                             f"recording this version can read")
+
+        self.screen_size = (width, height)
+        self.fleet_formation = self.file.read(formation_length).decode('utf-8')
+
+
+    def apply_to(self, settings):
+        """Change settings to match the game that was recorded."""
+        settings.headless_screen_size = self.screen_size
+        settings.simulation_rate = self.simulation_rate
+        settings.fleet_formation = self.fleet_formation
+
+
+    def steps(self):
+        """
+        Yield (step, events) for every step the session ran, with the events
+         handled before that step.
+        """
+        step = 0
+        events = []
+        for record_step, kind, key, x, y in self._records():
+            while step < record_step:
+                yield step, events
+                events = []
+                step += 1
+            if kind == END:
+                break
+            events.append(self._event(kind, key, x, y))
+        else:
+            # The recording was cut short; replay what there is.
+            if events:
+                yield step, events
+        self.file.close()
+
+
+    def _records(self):
+        """Yield every record, reading the file a chunk at a time."""
+        chunk_size = RECORD.size * CHUNK_RECORDS
+        while True:
+            chunk = self.file.read(chunk_size)
+            if not chunk:
+                return
+            whole = len(chunk) - len(chunk) % RECORD.size
+            yield from RECORD.iter_unpack(chunk[:whole])
+
+
+    def _event(self, kind, key, x, y):
+        """Return the pygame event a record stands for."""
+        if kind == KEYDOWN:
+            return pygame.event.Event(pygame.KEYDOWN, key=key)
+        if kind == KEYUP:
+            return pygame.event.Event(pygame.KEYUP, key=key)
+        if kind == DIFFICULTY:
+            return pygame.event.Event(DIFFICULTY_SELECTED,
+                                      difficulty=DIFFICULTIES[key])
+        if kind in ACTIONS:
+            return pygame.event.Event(CONTROLLER_ACTION, action=kind,
+                                      direction=key)
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(x, y),
+                                  button=1)
@@ -0,0 +1,94 @@
+import pygame
+
+from scoreboard import Scoreboard
+from game_state import GameState
+from dirty_renderer import DirtyRenderer
+
+class Renderer:
+    """
+    A class to draw the game onto the screen.
+    The simulation never calls the renderer, so a game can run without one,
+     or draw only some of its frames.
+    """
+
+    def __init__(self, ai_game):
+        """Create the scoreboard and choose how the screen is updated."""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        self.sb = Scoreboard(ai_game)
+
+        # Redraw only the changed parts of the screen if configured to.
+        if self.settings.dirty_rect_rendering:
+            self.dirty = DirtyRenderer(ai_game, self)
+        else:
+            self.dirty = None
+
+
+    def request_full_redraw(self):
+        """Redraw and send the whole screen on the next frame."""
+        if self.dirty:
+            self.dirty.request_full_redraw()
+
+
+    def render(self):
+        """Update images on the screen, and flip to the new screen."""
+        if self.dirty:
+            self.dirty.render()
+            return
+
+        self.screen.fill(self.settings.bg_color)
+        self.draw_scene()
+        pygame.display.flip()
+
+
+    def offsets(self):
+        """
+        Return how far (in whole pixels) to shift the ship, the fleet, ship
+         bullets and alien bullets, so they are drawn between their last two
+         simulated positions.
+        """
+        ai_game = self.ai_game
+        lag = 1 - ai_game.render_alpha
+        if not lag or ai_game.state is not GameState.PLAYING:
+            return 0, 0, 0, 0
+
+        settings = self.settings
+        scale = settings.motion_scale * lag
+        ship_dx = round((ai_game.ship.previous_x - ai_game.ship.x) * lag)
+        fleet_dx = -round(settings.alien_speed * settings.fleet_direction
+                          * scale)
+        ship_bullet_dy = round(settings.ship_bullet_speed * scale)
+        alien_bullet_dy = -round(settings.alien_bullet_speed * scale)
+        return ship_dx, fleet_dx, ship_bullet_dy, alien_bullet_dy
+
+
+    def draw_scene(self):
+        """Draw every game element onto the screen surface."""
+        ai_game = self.ai_game
+        ship_dx, fleet_dx, ship_bullet_dy, alien_bullet_dy = self.offsets()
+
+        ai_game.ship_bullets.draw_bullets(ship_bullet_dy)
+        ai_game.ship.blitme(ship_dx)
+
+        # Draw the shield if it's active.
+        ai_game.shield.draw()
+
+        ai_game.aliens.draw(self.screen, fleet_dx)
+        ai_game.alien_bullets.draw_bullets(alien_bullet_dy)
+
+        # Draw the score information and the shield availability status.
+        self.sb.show_score()
+
+        # Draw the play button if the game is inactive.
+        if not ai_game.game_active:
+            ai_game.play_button.draw_button()
+            if ai_game.state is GameState.DIFFICULTY_SELECT:
+                ai_game.easy_button.draw_button()
+                ai_game.medium_button.draw_button()
+                ai_game.hard_button.draw_button()
+
+        # Draw the frame timing overlay if it's toggled on.
+        if ai_game.frame_timer.overlay_visible:
+            ai_game.frame_timer.draw_overlay()
@@ -0,0 +1,388 @@
+from collections import namedtuple
+from pathlib import Path
+from random import getrandbits
+from time import time
+from zlib import crc32
+import os
+import queue
+import struct
+import threading
+
+from difficulty import DIFFICULTIES
+
+# The log starts with a header: a magic number, the format version, and a
+#  generation number that changes whenever the log is compacted.
+LOG_MAGIC = b'AISL'
+VERSION = 1
+LOG_HEADER = struct.Struct('<4sHQ')
+
+# Then one record per game: score, level, difficulty, timestamp, frames and
+#  seed (-1 if there wasn't one). Each record in the log is followed by a
+#  CRC-32 of its bytes, so a write torn by a crash is spotted and dropped.
+RECORD = struct.Struct('<qHBdIq')
+CHECKSUM = struct.Struct('<I')
+LOG_RECORD_SIZE = RECORD.size + CHECKSUM.size
+
+# The index holds the generation of the log it was built from, how many
+#  bytes of the log it covers, and how many entries each difficulty has,
+#  followed by top_n records per difficulty (best first, padded with zeros)
+#  and a CRC-32 of everything before it.
+INDEX_MAGIC = b'AISX'
+INDEX_HEADER = struct.Struct('<4sHHQQ')
+
+COUNTS = struct.Struct(f'<{len(DIFFICULTIES)}H')
+
+GameRecord = namedtuple('GameRecord', 'score level difficulty timestamp '
+                                      'frames seed')
+
+
+class ScoreHistory:
+    """
+    A class to keep a record of every game played, and a leaderboard of the
+     best games at each difficulty.
+    Games are appended to a log by a background thread, in batches, so the
+     game never waits on the disk. After each batch the leaderboard is saved
+     to a small index file of fixed size, which is all that needs reading to
+     show it, however long the log gets.
+    """
+
+    def __init__(self, directory='scores', top_n=10, max_games=None):
+        """
+        Open the history in directory, creating it if needed.
+        The leaderboard keeps top_n games per difficulty. If max_games is
+         given, the log is compacted whenever it holds twice that many games.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.directory / 'games.log'
+        self.index_path = self.directory / 'leaderboard.idx'
+        self.top_n = top_n
+        self.max_games = max_games
+
+        # Only one thread touches the files at a time.
+        self.file_lock = threading.Lock()
+
+        # Remove anything left behind by an interrupted compaction.
+        for path in self.directory.glob('*.tmp'):
+            path.unlink()
+
+        # The writer's leaderboard only holds games already in the log, so it
+        #  always matches what the index says. The game's copy also includes
+        #  games still waiting to be written.
+        self._open()
+        self.leaderboard = {difficulty: list(games)
+                            for difficulty, games in self.indexed.items()}
+
+        # The first error the writer hits, raised to the next caller who
+        #  waits for it.
+        self.error = None
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self._write_batches,
+                                       daemon=True, name='score writer')
+        self.writer.start()
+
+
+    def record(self, score, level, difficulty, frames, seed=None):
+        """Log a finished game. The game is written in the background."""
+        game = GameRecord(score, level, difficulty or 'medium', time(),
+                          frames, -1 if seed is None else seed)
+        self._insert(self.leaderboard, game)
+        self.pending.put(game)
+
+
+    def top(self, difficulty, count=None):
+        """Return the best games at a difficulty, best first."""
+        return self.leaderboard[difficulty or 'medium'][:count]
+
+
+    def high_score(self):
+        """Return the best score at any difficulty, or 0."""
+        return max((games[0].score for games in self.leaderboard.values()
+                    if games), default=0)
+
+
+    def games(self):
+        """Yield every game in the log, oldest first."""
+        # Games are only ever added to the end, and compaction swaps in a
+        #  new file, so the log can be read while the writer runs.
+        self.flush()
+        with open(self.log_path, 'rb') as f:
+            f.seek(LOG_HEADER.size)
+            yield from self._read_records(f)
+
+
+    def flush(self):
+        """
+        Wait until every logged game has been written, raising the error if
+         the writer couldn't write one.
+        """
+        self.pending.join()
+        self._raise_writer_error()
+
+
+    def close(self):
+        """Write any waiting games and stop the writer."""
+        self.pending.put(None)
+        self.writer.join()
+        self._raise_writer_error()
+
+
+    def compact(self, keep):
+        """
+        Rewrite the log with only the latest keep games and the games on the
+         leaderboard, replacing it in one step so a crash leaves either the
+         old log or the new one.
+        """
+        self.flush()
+        with self.file_lock:
+            self._compact(keep)
+
+
+    def _write_batches(self):
+        """Write waiting games to the log until the history is closed."""
+        while True:
+            batch = [self.pending.get()]
+            # Take whatever else is waiting, so a burst of games is written
+            #  together.
+            while True:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            games = [game for game in batch if game is not None]
+            try:
+                if games:
+                    with self.file_lock:
+                        self._append(games)
+            except Exception as error:
+                # Keep the writer running, so nobody waiting on it hangs.
+                if self.error is None:
+                    self.error = error
+            finally:
+                for _ in batch:
+                    self.pending.task_done()
+            if None in batch:
+                return
+
+
+    def _raise_writer_error(self):
+        """Raise the error the writer hit, if it hit one since last time."""
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+
+    def _append(self, games):
+        """Append games to the log, then save the index."""
+        with open(self.log_path, 'ab') as f:
+            f.write(b''.join(self._pack_log_record(game) for game in games))
+            f.flush()
+            os.fsync(f.fileno())
+            log_length = f.tell()
+
+        for game in games:
+            self._insert(self.indexed, game)
+        self._write_index(log_length)
+
+        log_games = (log_length - LOG_HEADER.size) // LOG_RECORD_SIZE
+        if self.max_games and log_games >= 2 * self.max_games:
+            self._compact(self.max_games)
+
+
+    def _compact(self, keep):
+        """Rewrite the log, keeping the latest and the best games."""
+        with open(self.log_path, 'rb') as f:
+            f.seek(LOG_HEADER.size)
+            games = list(self._read_records(f))
+
+        best = {game for board in self.indexed.values() for game in board}
+        latest = set(games[-keep:]) if keep else set()
+        kept = [game for game in games if game in best or game in latest]
+
+        generation = getrandbits(63)
+        temporary_path = self.log_path.with_suffix('.log.tmp')
+        with open(temporary_path, 'wb') as f:
+            f.write(LOG_HEADER.pack(LOG_MAGIC, VERSION, generation))
+            f.write(b''.join(self._pack_log_record(game) for game in kept))
+            f.flush()
+            os.fsync(f.fileno())
+            log_length = f.tell()
+        os.replace(temporary_path, self.log_path)
+        self._sync_directory()
+
+        # Until the new index is in place the generations don't match, so a
+        #  crash here just means the index is rebuilt on the next start.
+        self.generation = generation
+        self._write_index(log_length)
+
+
+    def _open(self):
+        """
+        Open the log, creating it if needed, and load the leaderboard. The
+         leaderboard comes from the index, plus any games logged after the
+         index was last saved. The log is only read in full if the index is
+         missing or out of date.
+        """
+        if not self.log_path.exists():
+            self.generation = getrandbits(63)
+            self.indexed = self._empty_leaderboard()
+            with open(self.log_path, 'wb') as f:
+                f.write(LOG_HEADER.pack(LOG_MAGIC, VERSION, self.generation))
+            return
+
+        with open(self.log_path, 'r+b') as f:
+            magic, version, generation = LOG_HEADER.unpack(
+                f.read(LOG_HEADER.size))
+            if magic != LOG_MAGIC or version != VERSION:
+                raise ValueError(f"{self.log_path} is not a score log")
+
+            log_length = f.seek(0, os.SEEK_END)
+            indexed_length, leaderboard = self._read_index(generation)
+            if indexed_length > log_length:
+                indexed_length, leaderboard = (LOG_HEADER.size,
+                                               self._empty_leaderboard())
+
+            # Add the games the index doesn't cover yet.
+            f.seek(indexed_length)
+            for game in self._read_records(f):
+                self._insert(leaderboard, game)
+
+            # Cut off a torn record, so the next game is appended cleanly.
+            valid_length = f.tell()
+            if valid_length < log_length:
+                f.truncate(valid_length)
+
+        self.generation = generation
+        self.indexed = leaderboard
+        if valid_length != indexed_length:
+            self._write_index(valid_length)
+
+
+    def _read_index(self, generation):
+        """
+        Return the log length the index covers and its leaderboard, or the
+         start of the log and an empty leaderboard if the index can't be used.
+        """
+        unusable = LOG_HEADER.size, self._empty_leaderboard()
+        size = (INDEX_HEADER.size + COUNTS.size
+                + len(DIFFICULTIES) * self.top_n * RECORD.size
+                + CHECKSUM.size)
+        try:
+            data = self.index_path.read_bytes()
+        except OSError:
+            return unusable
+        if len(data) != size:
+            return unusable
+
+        magic, version, top_n, index_generation, log_length = (
+            INDEX_HEADER.unpack_from(data))
+        (checksum,) = CHECKSUM.unpack_from(data, size - CHECKSUM.size)
+        if (magic != INDEX_MAGIC or version != VERSION or top_n != self.top_n
+                or index_generation != generation
+                or checksum != crc32(data[:size - CHECKSUM.size])):
+            return unusable
+
+        leaderboard = {}
+        counts = COUNTS.unpack_from(data, INDEX_HEADER.size)
+        offset = INDEX_HEADER.size + COUNTS.size
+        for difficulty, count in zip(DIFFICULTIES, counts):
+            leaderboard[difficulty] = [
+                self._unpack(RECORD.unpack_from(data, offset
+                                                + number * RECORD.size))
+                for number in range(count)]
+            offset += self.top_n * RECORD.size
+        return log_length, leaderboard
+
+
+    def _write_index(self, log_length):
+        """Save the writer's leaderboard, replacing the index in one step."""
+        parts = [INDEX_HEADER.pack(INDEX_MAGIC, VERSION, self.top_n,
+                                   self.generation, log_length),
+                 COUNTS.pack(*(len(self.indexed[difficulty])
+                               for difficulty in DIFFICULTIES))]
+        padding = bytes(RECORD.size)
+        for difficulty in DIFFICULTIES:
+            games = self.indexed[difficulty]
+            parts += [self._pack(game) for game in games]
+            parts += [padding] * (self.top_n - len(games))
+        data = b''.join(parts)
+        data += CHECKSUM.pack(crc32(data))
+
+        temporary_path = self.index_path.with_suffix('.idx.tmp')
+        with open(temporary_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, self.index_path)
+
+
+    def _read_records(self, f, chunk_records=4096):
+        """
+        Yield the games in f from its current position, in chunks, stopping
+         at the first torn record. f is left just after the last good one.
+        """
+        while True:
+            start = f.tell()
+            chunk = f.read(chunk_records * LOG_RECORD_SIZE)
+            good = 0
+            for offset in range(0, len(chunk) - LOG_RECORD_SIZE + 1,
+                                LOG_RECORD_SIZE):
+                payload = chunk[offset:offset + RECORD.size]
+                (checksum,) = CHECKSUM.unpack_from(chunk,
+                                                   offset + RECORD.size)
+                if checksum != crc32(payload):
+                    break
+                yield self._unpack(RECORD.unpack(payload))
+                good = offset + LOG_RECORD_SIZE
+
+            f.seek(start + good)
+            if good < len(chunk) or not chunk:
+                return
+
+
+    def _insert(self, leaderboard, game):
+        """Add game to a leaderboard if it's good enough."""
+        games = leaderboard[game.difficulty]
+        if len(games) == self.top_n and game.score <= games[-1].score:
+            return
+        # Higher scores first; earlier games win ties.
+        games.append(game)
+        games.sort(key=lambda game: (-game.score, game.timestamp))
+        del games[self.top_n:]
+
+
+    def _empty_leaderboard(self):
+        """Return a leaderboard with no games."""
+        return {difficulty: [] for difficulty in DIFFICULTIES}
+
+
+    def _pack_log_record(self, game):
+        """Return the bytes of a game in the log."""
+        payload = self._pack(game)
+        return payload + CHECKSUM.pack(crc32(payload))
+
+
+    def _pack(self, game):
+        """Return the bytes of a game record."""
+        return RECORD.pack(game.score, game.level,
+                           DIFFICULTIES.index(game.difficulty),
+                           game.timestamp, game.frames, game.seed)
+
+
+    def _unpack(self, fields):
+        """Return the game record for fields read from a file."""
+        score, level, difficulty, timestamp, frames, seed = fields
+        return GameRecord(score, level, DIFFICULTIES[difficulty], timestamp,
+                          frames, seed)
+
+
+    def _sync_directory(self):
+        """Make a rename in the history's directory survive a crash."""
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        descriptor = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
@@ -1,10 +1,13 @@
-import pygame.font
 from pygame.sprite import Group
 
 from ship import Ship
 
 class Scoreboard:
-    """A class to report scoring information."""
+    """
+    A class to report scoring information.
+    The images are prepared again whenever the statistics they show change,
+     so the game never has to tell the scoreboard about a change.
+    """
 
     def __init__(self, ai_game):
         """Initialize scorekeeping attributes."""
@@ -16,7 +19,22 @@ class Scoreboard:
 
         # Font settings for scoring information.
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = ai_game.text_cache.font(None, 48)
+
+        # Scores and levels are drawn from pre-rendered digits.
+        self.digits = ai_game.text_cache.atlas(self.font, self.text_color,
+                                               self.settings.bg_color)
+
+        # The shield availability status never changes, so render it once.
+        self.availability_image = ai_game.text_cache.render(
+            self.font, "SHIELD AVAILABLE", self.text_color,
+            self.settings.bg_color)
+        self.availability_rect = self.availability_image.get_rect()
+
+        # Changed statistics are rendered again every refresh_interval
+        #  frames; the frame governor raises it when frames run slow.
+        self.refresh_interval = 1
+        self.frames = 0
 
         # Prepare the initial score images.
         self.prep_images()
@@ -32,10 +50,10 @@ class Scoreboard:
 
     def prep_score(self):
         """Turn the score into a rendered image."""
+        self.shown_score = self.stats.score
         rounded_score = round(self.stats.score, -1)
         score_str = f"{rounded_score:,}"
-        self.score_image = self.font.render(score_str, True, self.text_color,
-                                            self.settings.bg_color)
+        self.score_image = self.digits.render(score_str)
         
         # Display the score at the top right of the screen.
         self.score_rect = self.score_image.get_rect()
@@ -45,30 +63,26 @@ class Scoreboard:
 
     def prep_high_score(self):
         """Turn the high score into a rendered image."""
+        self.shown_high_score = self.stats.high_score
         high_score = round(self.stats.high_score, -1)
         high_score_str = f"{high_score:,}"
-        self.high_score_image = self.font.render(high_score_str, True,
-                                                 self.text_color,
-                                                 self.settings.bg_color)
+        self.high_score_image = self.digits.render(high_score_str)
         
         # Center the high score at the top of the screen.
         self.high_score_rect = self.high_score_image.get_rect()
         self.high_score_rect.centerx = self.screen_rect.centerx
         self.high_score_rect.top = self.score_rect.top
 
+        # Show the shield availability status to the left of the high score.
+        self.availability_rect.top = self.score_rect.top
+        self.availability_rect.right = self.high_score_rect.left - 250
 
-    def check_high_score(self):
-        """Check to see if there's a new high score."""
-        if self.stats.score > self.stats.high_score:
-            self.stats.high_score = self.stats.score
-            self.prep_high_score()
 
-    
     def prep_level(self):
         """"Turn the level into a rendered image."""
+        self.shown_level = self.stats.level
         level_str = str(self.stats.level)
-        self.level_image = self.font.render(level_str, True, self.text_color,
-                                            self.settings.bg_color)
+        self.level_image = self.digits.render(level_str)
         
         # Position the level below the score.
         self.level_rect = self.level_image.get_rect()
@@ -78,6 +92,7 @@ class Scoreboard:
 
     def prep_ships(self):
         """Show how many ships are left."""
+        self.shown_ships_left = self.stats.ships_left
         self.ships = Group()
         for ship_number in range(self.stats.ships_left):
             ship = Ship(self.ai_game)
@@ -86,9 +101,33 @@ class Scoreboard:
             self.ships.add(ship)
 
 
+    def update(self):
+        """Prepare new images for any statistics that have changed."""
+        self.frames += 1
+        if self.frames % self.refresh_interval:
+            return
+
+        stats = self.stats
+        if stats.score != self.shown_score:
+            self.prep_score()
+        if stats.high_score != self.shown_high_score:
+            self.prep_high_score()
+        if stats.level != self.shown_level:
+            self.prep_level()
+        if stats.ships_left != self.shown_ships_left:
+            self.prep_ships()
+
+
     def show_score(self):
-        """Draw scores, level, and ships to the screen."""
+        """
+        Draw scores, level, ships, and the shield availability status to the
+         screen.
+        """
+        self.update()
         self.screen.blit(self.score_image, self.score_rect)
         self.screen.blit(self.high_score_image, self.high_score_rect)
         self.screen.blit(self.level_image, self.level_rect)
-        self.ships.draw(self.screen)
\ No newline at end of file
+        self.ships.draw(self.screen)
+
+        if self.ai_game.shield.shield_available:
+            self.screen.blit(self.availability_image, self.availability_rect)
\ No newline at end of file
@@ -5,23 +5,126 @@ class Settings:
         """Initilize the game's static settings."""
         # Screen settings
         self.bg_color = (230, 230, 230)
+        # Screens drawn per second; 0 draws as often as possible.
+        self.frame_rate = 60
+
+        # Simulation steps per second, independent of the frame rate. Speeds
+        #  are given per 1/60 of a second, and the game sets motion_scale so
+        #  the pace stays the same at any simulation rate.
+        self.simulation_rate = 60
+        self.motion_scale = 1.0
+        # Most steps run before drawing a frame, so a slow frame can't make
+        #  the simulation fall further and further behind.
+        self.max_steps_per_frame = 5
+        # Draw moving objects between their last two simulated positions.
+        self.render_interpolation = True
+
+        # Redraw only the parts of the screen that changed each frame.
+        self.dirty_rect_rendering = False
+
+        # Frame governor settings: whether to give up quality when frames
+        #  run over budget (seconds, or None for 1 / frame_rate), and which
+        #  tiers of quality to give up, in order (see frame_governor.py).
+        self.frame_governor = True
+        self.frame_budget = None
+        self.governor_tiers = ('hud', 'sounds', 'render', 'collisions')
+        # Frames a tier is judged on before giving up the next one, and how
+        #  many frames in a row must take less than governor_restore_fraction
+        #  of the budget before a tier comes back.
+        self.governor_window = 60
+        self.governor_restore_frames = 300
+        self.governor_restore_fraction = 0.6
+        # How the tiers save time: the HUD is rendered every
+        #  governor_hud_refresh frames, the screen drawn every
+        #  governor_render_every frames, and ship bullets checked against
+        #  the fleet every governor_collision_interval steps.
+        self.governor_hud_refresh = 15
+        self.governor_render_every = 2
+        self.governor_collision_interval = 2
+
+        # Size of the window used when the game runs without a display.
+        self.headless_screen_size = (1200, 800)
+        # Draw only every render_every'th frame of a headless game.
+        self.render_every = 1
+
+        # Frame timing settings: how many recent frames to keep, and a CSV
+        #  file to write them to when the game quits.
+        self.frame_timing_capacity = 600
+        self.frame_timing_csv = None
+
+        # A file to record the player's inputs to, so the session can be
+        #  replayed exactly.
+        self.input_record_path = None
+
+        # Score history settings: where every game is logged (None to log
+        #  nothing), how many games per difficulty the leaderboard keeps,
+        #  and how many games the log is compacted down to once it holds
+        #  twice as many (None to keep them all).
+        self.score_history_dir = 'scores'
+        self.leaderboard_size = 10
+        self.score_history_max_games = None
+
+        # Print the load time and memory of every asset at startup.
+        self.report_asset_loads = False
+        # Directory to keep derived images in between runs (see
+        #  alien_invasion.py --bake-assets), or None to compute them each time.
+        self.asset_cache_dir = None
+
+        # Sound settings: 'mixer' plays sounds, 'null' plays nothing (as
+        #  headless games always do). Each category of sound effect gets
+        #  this many reserved channels, the most that can be heard at once.
+        self.sound_backend = 'mixer'
+        self.sound_voices = {
+            'shooting': 3,
+            'alien_explosion': 4,
+            'ship_explosion': 1,
+            'shield_explosion': 1,
+        }
+        # Sound effects still played when the frame governor drops the rest.
+        self.critical_sounds = ('ship_explosion',)
+
+        # Most rendered text labels to keep before dropping the least recently
+        #  used one.
+        self.text_cache_size = 64
 
         # Ship settings
         self.ship_limit = 3
+        # Seconds to wait after the ship is hit before the next ship.
+        self.respawn_pause = 2.0
 
         # Bullet (fired from the ship) settings
         self.ship_bullet_width = 3
         self.ship_bullet_height = 15
         self.ship_bullet_color = (60, 60, 60)
         self.ship_bullets_allowed = 3
+
+        # Bullets are stored as 'sprites' (one Sprite per bullet) or 'pool'
+        #  (preallocated arrays that grow from bullet_pool_capacity).
+        self.bullet_backend = 'sprites'
+        self.bullet_pool_capacity = 64
         
         # Alien settings
+        # The fleet is stored as 'sprites' (one Alien per alien) or 'array'
+        #  (NumPy arrays, for very large fleets).
+        self.fleet_backend = 'sprites'
+        # Size of the cells used to find aliens near a bullet, in pixels.
+        self.collision_cell_size = 128
+        # Prepare the next fleet once this fraction of the fleet is left.
+        self.fleet_prefetch_fraction = 0.25
+        # Steps the prepared fleet is built over, a chunk at a time.
+        self.fleet_prefetch_steps = 30
+        # The fleet's formation: 'grid', or one named in formations_file.
+        self.fleet_formation = 'grid'
+        self.formations_file = 'formations.json'
         self.alien_color = (27, 204, 6)
         self.alien_shooter_color = (136, 8, 8)
         self.color_tolerance = 50
         self.fleet_drop_speed = 10
+        # Seconds between a shooter's volleys of shots, how many shots are in
+        #  a volley, and the seconds between the shots of a volley.
         self.cooldown_period = 20
-        self.alien_shooter_probability = 0.075
+        self.alien_volley_size = 1
+        self.alien_volley_spacing = 0.15
 
         # Bullet (fired from aliens) settings
         self.alien_bullet_width = 4
@@ -39,42 +142,30 @@ class Settings:
         self.speedup_scale = 1.5
         # How quickly the alien point values increase
         self.score_scale = 1.5
+        # The file giving where each difficulty starts (see difficulty.py),
+        #  and how many levels of each are worked out when the game starts.
+        self.difficulty_file = 'difficulty.json'
+        self.difficulty_levels = 30
 
     
     def initialize_dynamic_settings(self, difficulty_level=''):
         """
         Initialize settings that change throughout the game.
-        The starting speed of the alien and the ship
-         depends on the selected difficulty level.
+        The speeds and points of each level come from the difficulty table.
         """
         self.difficulty_level = difficulty_level
-        
-        self.ship_bullet_speed = 2.5
-        
-        if difficulty_level == 'easy':
-            self.ship_speed = 2
-            self.alien_speed = 0.75
-            self.alien_shooter_probability = 0.05
-        elif difficulty_level == 'hard':
-            self.ship_speed = 1.5
-            self.alien_speed = 1.25
-            self.alien_shooter_probability = 0.1
-        else:
-            self.ship_speed = 1.5
-            self.alien_speed = 1.0
 
         # fleet_direction of 1 represents right; -1 represents left.
         self.fleet_direction = 1
 
-        # Scoring settings.
-        self.alien_points = 50
 
-    
-    def increase_speed(self):
-        """Increase speed settings and alien point values."""
-        self.ship_speed *= self.speedup_scale
-        self.ship_bullet_speed *= self.speedup_scale
-        self.alien_speed *= self.speedup_scale
-        self.alien_shooter_probability *= self.speedup_scale
-
-        self.alien_points = int(self.alien_points * self.score_scale)
\ No newline at end of file
+    def apply_level(self, level_settings):
+        """
+        Copy a level's speeds and points from its LevelSettings, for code
+         that reads them from the settings.
+        """
+        self.ship_speed = level_settings.ship_speed
+        self.ship_bullet_speed = level_settings.ship_bullet_speed
+        self.alien_speed = level_settings.alien_speed
+        self.alien_shooter_probability = level_settings.alien_shooter_probability
+        self.alien_points = level_settings.alien_points
\ No newline at end of file
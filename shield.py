@@ -6,14 +6,14 @@ class Shield:
     def __init__(self, ai_game):
         """Create a shield object above the ship's current position."""
         self.screen = ai_game.screen
-        self.screen_rect = ai_game.screen.get_rect()
+        self.screen_rect = pygame.Rect(0, 0, ai_game.settings.screen_width,
+                                       ai_game.settings.screen_height)
         self.settings = ai_game.settings
         self.color = self.settings.shield_color
         self.width = self.settings.shield_width
         self.height = self.settings.shield_height
         self.health = self.settings.shield_health
         self.ship = ai_game.ship
-        self.sb = ai_game.sb
         self.sound_effects = ai_game.sound_effects
 
         # Initialize the shield's availability and active status.
@@ -56,6 +56,11 @@ class Shield:
         self.rect.right = -10
 
 
+    def in_play(self):
+        """Return True if the shield is on the screen and can be hit."""
+        return self.rect.right > 0
+
+
     def reset_shield(self):
         """Reset the shield's health and availability."""
         self._destroy()
@@ -71,19 +76,6 @@ class Shield:
             self.set_position()
 
 
-    def draw_availability_status(self):
-        """Draw the shield's availability status to the screen."""
-        self.availability_image = self.sb.font.render("SHIELD AVAILABLE", 
-                                                      True,
-                                                      self.sb.text_color,
-                                                      self.settings.bg_color)
-        self.availability_rect = self.availability_image.get_rect()
-        self.availability_rect.top = self.sb.score_rect.top
-        self.availability_rect.right = self.sb.high_score_rect.left - 250
-        self.screen.blit(self.availability_image,
-                         self.availability_rect)
-
-
     def draw(self):
         """Draw the shield to the screen."""
         if self.shield_active:
@@ -7,12 +7,14 @@ class Ship(Sprite):
     def __init__(self, ai_game):
         """Initialize the ship and set its starting position."""
         super().__init__()
+        self.ai_game = ai_game
         self.screen = ai_game.screen
-        self.screen_rect = ai_game.screen.get_rect()
         self.settings = ai_game.settings
+        self.screen_rect = pygame.Rect(0, 0, self.settings.screen_width,
+                                       self.settings.screen_height)
 
         # Load the ship image and get its rect.
-        self.image = pygame.image.load('images/ship.bmp')
+        self.image = ai_game.assets.image('images/ship.bmp')
         self.rect = self.image.get_rect()
 
         # Start each new ship at the bottom center of the screen.
@@ -20,6 +22,7 @@ class Ship(Sprite):
 
         # Store a float for the ship's exact horizontal position.
         self.x = float(self.rect.x)
+        self.previous_x = self.x
         
         # Movement flag; start with a ship that's not moving.
         self.moving_right = False
@@ -28,11 +31,15 @@ class Ship(Sprite):
 
     def update(self):
         """Update the ship's position based on the movement flag."""
+        # Remember where the ship was, to draw it between its positions.
+        self.previous_x = self.x
+
         # Update the ship's x value, not the rect
+        speed = self.ai_game.level_settings.ship_step
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += speed
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= speed
 
         # Update rect object from self.x.
         self.rect.x = self.x
@@ -42,8 +49,9 @@ class Ship(Sprite):
         """Center the ship on the screen."""
         self.rect.midbottom = self.screen_rect.midbottom
         self.x = float(self.rect.x)
+        self.previous_x = self.x
 
 
-    def blitme(self):
-        """Draw the ship at its current location."""
-        self.screen.blit(self.image, self.rect)
\ No newline at end of file
+    def blitme(self, offset_x=0):
+        """Draw the ship at its current location, shifted by offset_x."""
+        self.screen.blit(self.image, self.rect.move(offset_x, 0))
\ No newline at end of file
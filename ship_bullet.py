@@ -1,5 +1,5 @@
 import pygame
-from pygame.sprite import Sprite
+from pygame.sprite import Sprite, Group
 
 class ShipBullet(Sprite):
     """A class to manage bullets fired from the ship."""
@@ -20,14 +20,65 @@ class ShipBullet(Sprite):
         self.y = float(self.rect.y)
     
 
-    def update(self):
-        """Move the bullet up the screen."""
+    def update(self, dy):
+        """Move the bullet dy pixels up the screen."""
         # Update the exact position of the bullet.
-        self.y -= self.settings.ship_bullet_speed
+        self.y -= dy
         # Update the rect position.
         self.rect.y = self.y
 
 
-    def draw_bullet(self):
-        """Draw the bullet to the screen."""
-        pygame.draw.rect(self.screen, self.color, self.rect)
\ No newline at end of file
+    def draw_bullet(self, offset_y=0):
+        """Draw the bullet to the screen, shifted down by offset_y."""
+        pygame.draw.rect(self.screen, self.color, self.rect.move(0, offset_y))
+
+class ShipBulletGroup(Group):
+    """A class to manage the bullets fired from the ship as sprites."""
+
+    def __init__(self, ai_game):
+        """Initialize an empty group of bullets."""
+        super().__init__()
+        self.ai_game = ai_game
+
+
+    def fire(self):
+        """Fire a new bullet from the ship's current position."""
+        self.add(ShipBullet(self.ai_game))
+
+
+    def add_bullet_at(self, x, y):
+        """Add a bullet with its top left corner at (x, y)."""
+        new_bullet = ShipBullet(self.ai_game)
+        new_bullet.rect.x = x
+        new_bullet.y = float(y)
+        new_bullet.rect.y = y
+        self.add(new_bullet)
+
+
+    def update(self):
+        """Move the bullets, and get rid of those that have disappeared."""
+        super().update(self.ai_game.level_settings.ship_bullet_step)
+        for ship_bullet in self.sprites():
+            if ship_bullet.rect.bottom <= 0:
+                self.remove(ship_bullet)
+
+
+    def collide_fleet(self, fleet):
+        """Remove bullets and aliens that collide; return the collisions."""
+        return fleet.collide_group(self, True, True)
+
+
+    def rects(self):
+        """Return a copy of every bullet's rect."""
+        return [ship_bullet.rect.copy() for ship_bullet in self.sprites()]
+
+
+    def positions(self):
+        """Return the (x, y) top left corner of every bullet."""
+        return [ship_bullet.rect.topleft for ship_bullet in self.sprites()]
+
+
+    def draw_bullets(self, offset_y=0):
+        """Draw every bullet to the screen, shifted down by offset_y."""
+        for ship_bullet in self.sprites():
+            ship_bullet.draw_bullet(offset_y)
@@ -0,0 +1,92 @@
+from math import ceil
+import heapq
+
+class ShotScheduler:
+    """
+    A class to keep track of when each shooter fires next.
+    Only shooters are added, and they wait in a heap ordered by the step of
+     their next shot, so each step costs only as much as the shots it fires,
+     however big the fleet is. A shooter fires a volley of shots a few steps
+     apart, then waits its own period before the next volley.
+    """
+
+    def __init__(self):
+        """Initialize an empty scheduler."""
+        self.clear()
+
+
+    def clear(self):
+        """Remove every shooter and start counting steps again."""
+        self.step = 0
+        self.heap = []
+        # [next step, period, volley, spacing, shots left in the volley]
+        #  for each shooter, by key.
+        self.shooters = {}
+
+
+    def __len__(self):
+        """Return the number of shooters."""
+        return len(self.shooters)
+
+
+    def __contains__(self, key):
+        """Return True if key is a shooter."""
+        return key in self.shooters
+
+
+    def add(self, key, delay, period, volley=1, spacing=1):
+        """
+        Add a shooter that first fires delay steps from now, then every period
+         steps. Each time it fires volley shots, spacing steps apart.
+        Keys must be comparable; shooters due at the same step fire in order
+         of their keys.
+        """
+        next_step = self.step + max(1, delay)
+        self.shooters[key] = [next_step, max(1, period), max(1, volley),
+                              max(1, spacing), max(1, volley)]
+        heapq.heappush(self.heap, (next_step, key))
+
+
+    def cancel(self, key):
+        """Stop a shooter from firing again, if it's still a shooter."""
+        # The shooter's heap entry is left where it is and skipped when it
+        #  comes up, so cancelling doesn't have to search the heap.
+        if self.shooters.pop(key, None) is None:
+            return
+        if len(self.heap) > 2 * len(self.shooters) + 64:
+            self._rebuild()
+
+
+    def advance(self):
+        """Move on one step, and return the keys of the shooters that fire."""
+        self.step += 1
+        heap = self.heap
+        fired = []
+        while heap and heap[0][0] <= self.step:
+            step, key = heapq.heappop(heap)
+            shooter = self.shooters.get(key)
+            if shooter is None or shooter[0] != step:
+                # The shooter was cancelled.
+                continue
+
+            fired.append(key)
+            shooter[4] -= 1
+            if shooter[4]:
+                shooter[0] = step + shooter[3]
+            else:
+                shooter[0] = step + shooter[1]
+                shooter[4] = shooter[2]
+            heapq.heappush(heap, (shooter[0], key))
+        return fired
+
+
+    def _rebuild(self):
+        """Drop the heap entries of cancelled shooters."""
+        self.heap = [(shooter[0], key)
+                     for key, shooter in self.shooters.items()]
+        heapq.heapify(self.heap)
+
+
+def to_steps(seconds, simulation_rate):
+    """Return the number of simulation steps it takes for seconds to pass."""
+    return max(1, ceil(seconds * simulation_rate))
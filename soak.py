@@ -0,0 +1,191 @@
+"""
+Let the autopilot play a headless game for a long time, and report how frame
+ times and memory use change as it goes.
+
+Play for two hours, reporting every 20,000 frames:
+    python soak.py --minutes 120 --interval 20000 --csv soak.csv
+"""
+
+import argparse
+import csv
+import os
+from time import perf_counter
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from game_state import GameState
+from controllers import CONTROLLERS
+
+
+class SoakRun:
+    """A class to run a long headless game and track its performance."""
+
+    def __init__(self, seed=0, difficulty='medium', controller='autopilot',
+                 interval=10000, render=True):
+        """Create the game, with the frame timer sized to one interval."""
+        settings = Settings()
+        settings.frame_timing_capacity = interval
+        self.ai = AlienInvasion(headless=True, seed=seed, settings=settings,
+                                display=render)
+        self.ai.controller = CONTROLLERS[controller](seed)
+        self.difficulty = difficulty
+        self.interval = interval
+        self.render = render
+
+        # One row of statistics per interval.
+        self.rows = []
+        self.games = 0
+
+
+    def run(self, minutes=None, frames=None):
+        """
+        Play until the time or frame limit is reached, printing a report
+         after every interval. New games start whenever one ends.
+        """
+        start = perf_counter()
+        played = 0
+        self._new_game()
+        print(self._header())
+
+        while True:
+            for _ in range(self.interval):
+                if self.ai.state is GameState.GAME_OVER:
+                    self._new_game()
+                self.ai._run_frame(self.render)
+            played += self.interval
+
+            row = self._record(played, perf_counter() - start)
+            print(self._format(row))
+
+            if frames is not None and played >= frames:
+                break
+            if minutes is not None and row['seconds'] >= minutes * 60:
+                break
+
+
+    def summary(self):
+        """Return lines describing the drift from the first interval."""
+        first, last = self.rows[0], self.rows[-1]
+        return [
+            f"Played {last['frames']} frames in {last['seconds']:.0f} s "
+            f"over {self.games} games.",
+            f"Median frame time {first['p50_ms']:.3f} ms -> "
+            f"{last['p50_ms']:.3f} ms ({self._drift(first, last, 'p50_ms')}), "
+            f"p99 {first['p99_ms']:.3f} ms -> {last['p99_ms']:.3f} ms "
+            f"({self._drift(first, last, 'p99_ms')}).",
+            f"Memory {first['memory_kb'] / 1024:.1f} MiB -> "
+            f"{last['memory_kb'] / 1024:.1f} MiB "
+            f"({(last['memory_kb'] - first['memory_kb']) / 1024:+.1f} MiB).",
+        ]
+
+
+    def write_csv(self, file_path):
+        """Write every interval's statistics to a CSV file."""
+        with open(file_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.rows[0]))
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+
+    def _new_game(self):
+        """Start a new game at the soak run's difficulty."""
+        self.ai.select_difficulty(self.difficulty)
+        self.games += 1
+
+
+    def _record(self, frames, seconds):
+        """Record the statistics of the interval that just ended."""
+        p50, p95, p99 = self.ai.frame_timer.percentiles()['total']
+        row = {
+            'frames': frames,
+            'seconds': round(seconds, 1),
+            'games': self.games,
+            'level': self.ai.stats.level,
+            'p50_ms': round(p50, 4),
+            'p95_ms': round(p95, 4),
+            'p99_ms': round(p99, 4),
+            'memory_kb': _memory_kb(),
+        }
+        self.rows.append(row)
+        return row
+
+
+    def _header(self):
+        """Return the heading of the interval reports."""
+        return (f"{'frames':>10}{'seconds':>9}{'games':>7}{'level':>6}"
+                f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'MiB':>9}"
+                f"{'drift':>9}")
+
+
+    def _format(self, row):
+        """Return one interval's report."""
+        return (f"{row['frames']:>10}{row['seconds']:>9.0f}{row['games']:>7}"
+                f"{row['level']:>6}{row['p50_ms']:>9.3f}{row['p95_ms']:>9.3f}"
+                f"{row['p99_ms']:>9.3f}{row['memory_kb'] / 1024:>9.1f}"
+                f"{self._drift(self.rows[0], row, 'p50_ms'):>9}")
+
+
+    def _drift(self, first, last, column):
+        """Return the change in a column since the first interval."""
+        if not first[column]:
+            return 'n/a'
+        return f"{(last[column] - first[column]) / first[column]:+.1%}"
+
+
+def _memory_kb():
+    """
+    Return the memory the process is using, in KiB. Where /proc isn't
+     available, the peak memory use is returned instead.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _parse_args():
+    """Parse the command line options."""
+    parser = argparse.ArgumentParser(
+        description="Soak test Alien Invasion with a scripted player.")
+    parser.add_argument('--minutes', type=float,
+                        help="stop after this many minutes")
+    parser.add_argument('--frames', type=int,
+                        help="stop after this many frames")
+    parser.add_argument('--interval', type=int, default=10000,
+                        help="frames between reports")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed for the game's random numbers")
+    parser.add_argument('--difficulty', choices=('easy', 'medium', 'hard'),
+                        default='medium', help="difficulty of each game")
+    parser.add_argument('--controller', choices=sorted(CONTROLLERS),
+                        default='autopilot', help="controller to play with")
+    parser.add_argument('--no-render', action='store_true',
+                        help="skip drawing the screen")
+    parser.add_argument('--csv', help="write the reports to this CSV file")
+    return parser.parse_args()
+
+
+def main():
+    """Run a soak test from the command line."""
+    args = _parse_args()
+    if args.minutes is None and args.frames is None:
+        args.minutes = 60
+
+    soak = SoakRun(args.seed, args.difficulty, args.controller,
+                   args.interval, not args.no_render)
+    soak.run(args.minutes, args.frames)
+    print('\n'.join(soak.summary()))
+    if args.csv:
+        soak.write_csv(args.csv)
+
+
+if __name__ == '__main__':
+    main()
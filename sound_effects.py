@@ -1,50 +1,160 @@
+import threading
+
+import pygame
 from pygame import mixer
 
+# The sound file and volume of each category of sound effect.
+EFFECTS = {
+    'shooting': ('sound/hand_phaser_weapon.wav', 0.1),
+    'alien_explosion': ('sound/sliding_door_truncated.wav', 0.1),
+    'ship_explosion': ('sound/severe_crash.wav', 0.5),
+    'shield_explosion': ('sound/descending_crash.wav', 0.25),
+}
+MUSIC_PATH = 'sound/raf_atmosphere.wav'
+MUSIC_VOLUME = 0.1
+
+
 class SoundEffects:
-    """A class to manage sound effects in the game."""
+    """
+    A class to manage sound effects in the game.
+    The sounds are loaded in the background, and each category of effect
+     plays on its own reserved channels, so no more than settings.sound_voices
+     of one kind are heard at once. Effects that aren't loaded yet, or whose
+     files are missing, are skipped.
+    """
+
+    def __init__(self, ai_game):
+        """Reserve the channels, and start loading the sounds."""
+        self.assets = ai_game.assets
+        voices = ai_game.settings.sound_voices
+
+        # Loaded sounds by category, filled in by the loading thread.
+        self.sounds = {}
+        self.missing = []
+
+        # The frame governor can drop all but the critical effects.
+        self.critical = ai_game.settings.critical_sounds
+        self.critical_only = False
+
+        # Reserve a block of channels for each category, so a burst of one
+        #  effect can't cut off the others. Channels are used in turn, so
+        #  when they're all busy the one that started longest ago is reused.
+        counts = [max(1, voices.get(category, 1)) for category in EFFECTS]
+        mixer.set_num_channels(sum(counts))
+        mixer.set_reserved(sum(counts))
+
+        self.channels = {}
+        self.next_channel = {}
+        first = 0
+        for category, count in zip(EFFECTS, counts):
+            self.channels[category] = [mixer.Channel(number) for number
+                                       in range(first, first + count)]
+            self.next_channel[category] = 0
+            first += count
+
+        self._loader = threading.Thread(target=self._load, daemon=True,
+                                        name='sound loader')
+        self._loader.start()
 
-    def __init__(self):
-        """Initialize all of the game's sound effects."""
-        # Load and play the background music.
-        self._play_background_music()
 
-        # Load the sound effects.
-        self.shooting_sound = mixer.Sound('sound/hand_phaser_weapon.wav')
-        self.alien_explosion_sound = (mixer.Sound
-                                      ('sound/sliding_door_truncated.wav'))
-        self.ship_explosion_sound = mixer.Sound('sound/severe_crash.wav')
-        self.shield_explosion_sound = mixer.Sound('sound/descending_crash.wav')
+    def wait_until_loaded(self, timeout=None):
+        """Wait for the loading thread to finish."""
+        self._loader.join(timeout)
 
-        # Set the volume for the background music and sound effects.
-        mixer.music.set_volume(0.1)
-        self.shooting_sound.set_volume(0.1)
-        self.alien_explosion_sound.set_volume(0.1)
-        self.shield_explosion_sound.set_volume(0.25)
-        self.ship_explosion_sound.set_volume(0.5)
+
+    def _load(self):
+        """Load the sound effects, then start the background music."""
+        for category, (path, volume) in EFFECTS.items():
+            try:
+                sound = self.assets.sound(path)
+            except (pygame.error, OSError) as e:
+                self._skip(path, e)
+                continue
+            sound.set_volume(volume)
+            self.sounds[category] = sound
+
+        self._play_background_music()
 
 
     def _play_background_music(self):
         """Play the background music."""
-        mixer.music.load('sound/raf_atmosphere.wav')
-        mixer.music.set_volume(3)
+        try:
+            mixer.music.load(MUSIC_PATH)
+        except (pygame.error, OSError) as e:
+            self._skip(MUSIC_PATH, e)
+            return
+        mixer.music.set_volume(MUSIC_VOLUME)
         mixer.music.play(-1)
 
 
+    def _skip(self, path, error):
+        """Note a sound file that couldn't be loaded, and play without it."""
+        self.missing.append(path)
+        print(f"Couldn't load {path} ({error}); playing without it.")
+
+
+    def play(self, category):
+        """Play a category of sound effect on its next reserved channel."""
+        sound = self.sounds.get(category)
+        if sound is None:
+            return
+        if self.critical_only and category not in self.critical:
+            return
+
+        channels = self.channels[category]
+        index = self.next_channel[category]
+        self.next_channel[category] = (index + 1) % len(channels)
+        channels[index].play(sound)
+
+
     def play_shooting_sound(self):
         """Play the shooting sound."""
-        self.shooting_sound.play()
+        self.play('shooting')
+
 
-    
     def play_alien_explosion_sound(self):
         """Play the alien explosion sound."""
-        self.alien_explosion_sound.play()
+        self.play('alien_explosion')
 
 
     def play_ship_explosion_sound(self):
         """Play the ship explosion sound."""
-        self.ship_explosion_sound.play()
+        self.play('ship_explosion')
 
 
     def play_shield_explosion_sound(self):
         """Play the shield explosion sound."""
-        self.shield_explosion_sound.play()   
\ No newline at end of file
+        self.play('shield_explosion')
+
+
+class NullSoundEffects:
+    """
+    A class with the same methods as SoundEffects that plays nothing, for
+     games nobody can hear.
+    """
+
+    # The frame governor sets this, though there's nothing to drop.
+    critical_only = False
+
+    def wait_until_loaded(self, timeout=None):
+        """There is nothing to load."""
+
+
+    def play(self, category):
+        """Play nothing."""
+
+
+    def play_shooting_sound(self):
+        """Play nothing."""
+
+
+    def play_alien_explosion_sound(self):
+        """Play nothing."""
+
+
+    def play_ship_explosion_sound(self):
+        """Play nothing."""
+
+
+    def play_shield_explosion_sound(self):
+        """Play nothing."""
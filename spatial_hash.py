@@ -0,0 +1,95 @@
+from math import floor
+
+class SpatialHash:
+    """
+    A class to find the items near a rect without testing every item.
+    Items are filed into square cells by the rects they had when inserted.
+    Moving every item by the same amount only shifts the hash's offset, so a
+     fleet moving in formation never has to be filed again.
+    """
+
+    def __init__(self, cell_size, margin=2):
+        """
+        Initialize an empty hash.
+        Queries are widened by margin pixels, which covers items whose rects
+         were rounded differently as they moved.
+        """
+        self.cell_size = cell_size
+        self.margin = margin
+        self.clear()
+
+
+    def clear(self):
+        """Remove every item and reset the offset."""
+        self.cells = {}
+        self.item_cells = {}
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self._next_order = 0
+
+
+    def __len__(self):
+        """Return the number of items in the hash."""
+        return len(self.item_cells)
+
+
+    def insert(self, item, rect):
+        """File item under every cell its rect overlaps."""
+        cells = self._cells_for(rect.x - self.offset_x, rect.y - self.offset_y,
+                                rect.width, rect.height)
+        order = self._next_order
+        self._next_order += 1
+
+        for cell in cells:
+            self.cells.setdefault(cell, {})[item] = order
+        self.item_cells[item] = cells
+
+
+    def remove(self, item):
+        """Remove item from the hash if it is there."""
+        cells = self.item_cells.pop(item, None)
+        if cells is None:
+            return
+
+        for cell in cells:
+            bucket = self.cells[cell]
+            del bucket[item]
+            if not bucket:
+                del self.cells[cell]
+
+
+    def move(self, dx, dy):
+        """Record that every item has moved by (dx, dy)."""
+        self.offset_x += dx
+        self.offset_y += dy
+
+
+    def query(self, rect):
+        """
+        Return the items that may overlap rect, in the order they were
+         inserted. Callers still need to test each item's rect exactly.
+        """
+        margin = self.margin
+        cells = self._cells_for(rect.x - self.offset_x - margin,
+                                rect.y - self.offset_y - margin,
+                                rect.width + 2 * margin,
+                                rect.height + 2 * margin)
+
+        found = {}
+        for cell in cells:
+            bucket = self.cells.get(cell)
+            if bucket:
+                found.update(bucket)
+
+        if len(found) < 2:
+            return list(found)
+        return sorted(found, key=found.get)
+
+
+    def _cells_for(self, x, y, width, height):
+        """Return the cells a rect at (x, y) with the given size overlaps."""
+        size = self.cell_size
+        left, right = floor(x / size), floor((x + width) / size)
+        top, bottom = floor(y / size), floor((y + height) / size)
+        return [(column, row) for column in range(left, right + 1)
+                for row in range(top, bottom + 1)]
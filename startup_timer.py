@@ -0,0 +1,29 @@
+from time import perf_counter
+
+class StartupTimer:
+    """A class to time each phase of the game's startup."""
+
+    def __init__(self, import_seconds=0.0):
+        """Start timing, counting the time spent importing modules first."""
+        self.phases = [('imports', import_seconds)]
+        self.last_mark = perf_counter()
+
+
+    def mark(self, phase):
+        """Record the time since the last mark as the given phase."""
+        now = perf_counter()
+        self.phases.append((phase, now - self.last_mark))
+        self.last_mark = now
+
+
+    def total(self):
+        """Return the seconds spent in every phase so far."""
+        return sum(seconds for _, seconds in self.phases)
+
+
+    def lines(self):
+        """Return a line for each phase, and one for the total."""
+        lines = [f"{phase:<16}{seconds * 1000:9.2f} ms"
+                 for phase, seconds in self.phases]
+        lines.append(f"{'total':<16}{self.total() * 1000:9.2f} ms")
+        return lines
@@ -0,0 +1,133 @@
+from collections import OrderedDict
+
+import pygame
+
+class GlyphAtlas:
+    """
+    A class to draw text from characters rendered ahead of time.
+    Text made of the atlas's characters, like scores, is put together by
+     blitting glyphs, without calling the font rasterizer.
+    """
+
+    def __init__(self, font, color, bg_color=None, characters='0123456789,'):
+        """Render every character of the atlas once."""
+        self.font = font
+        self.color = color
+        self.bg_color = bg_color
+        self.glyphs = {}
+        for character in characters:
+            self._glyph(character)
+        self.height = font.get_height()
+
+
+    def render(self, text):
+        """Return a new surface with text drawn from the atlas's glyphs."""
+        glyphs = [self._glyph(character) for character in text]
+        width = sum(glyph.get_width() for glyph in glyphs)
+
+        if self.bg_color is None:
+            surface = pygame.Surface((width, self.height), pygame.SRCALPHA)
+        else:
+            surface = pygame.Surface((width, self.height))
+            surface.fill(self.bg_color)
+
+        blits = []
+        x = 0
+        for glyph in glyphs:
+            blits.append((glyph, (x, 0)))
+            x += glyph.get_width()
+        surface.blits(blits, False)
+        return surface
+
+
+    def _glyph(self, character):
+        """Return the glyph for character, rendering it the first time."""
+        glyph = self.glyphs.get(character)
+        if glyph is None:
+            glyph = self.font.render(character, True, self.color,
+                                     self.bg_color)
+            self.glyphs[character] = glyph
+        return glyph
+
+
+class TextCache:
+    """
+    A class to share rendered text across the game.
+    Rendered strings are kept up to capacity, dropping the least recently
+     used string first. Glyph atlases are kept for as long as the cache.
+    """
+
+    def __init__(self, capacity=64):
+        """Initialize an empty cache that holds up to capacity strings."""
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.atlases = {}
+        self.fonts = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def font(self, name, size):
+        """
+        Return the shared font with the given name and size.
+        pygame's default font (name None) is loaded directly, which skips
+         the slow search through the system's fonts that SysFont does.
+        """
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            if name is None:
+                font = pygame.font.Font(None, size)
+            else:
+                font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+        return font
+
+
+    def render(self, font, text, color, bg_color=None):
+        """
+        Return the shared surface for text rendered in font.
+        Callers must not draw on the surface, as it may be handed out again.
+        """
+        key = (font, text, tuple(color), self._color_key(bg_color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color, bg_color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+
+    def atlas(self, font, color, bg_color=None):
+        """Return the shared glyph atlas for font in the given colors."""
+        key = (font, tuple(color), self._color_key(bg_color))
+        atlas = self.atlases.get(key)
+        if atlas is None:
+            atlas = GlyphAtlas(font, color, bg_color)
+            self.atlases[key] = atlas
+        return atlas
+
+
+    def stats(self):
+        """Return the cache's size, hits, misses and evictions."""
+        return {
+            'size': len(self.surfaces),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+    def _color_key(self, color):
+        """Return a hashable form of an optional color."""
+        return None if color is None else tuple(color)